@@ -1,62 +1,292 @@
+import time
+# Taken before the imports below, so the startup report covers them on a cold start
+SCRIPT_STARTED = time.perf_counter()
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from datetime import datetime, timedelta
-import time
-import pandas as pd
-from functools import lru_cache
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+import random
+from email.utils import parsedate_to_datetime
+from collections import OrderedDict, deque
+import threading
+import bisect
+import re
+import hashlib
+import zlib
+import pickle
+import ast
+import difflib
+import gzip
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache, wraps
+from contextlib import contextmanager
+import cProfile
+import pstats
+import io
+import logging
+import importlib
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
-# --- Page Configuration ---
-st.set_page_config(
-    page_title="Vapi Agent Configuration Editor",
-    page_icon="🤖",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# --- Custom CSS for Better Styling ---
-st.markdown("""
-    <style>
-        .metric-card {
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin: 10px 0;
-        }
-        .success-box {
-            background-color: #d4edda;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #28a745;
-        }
-        .error-box {
-            background-color: #f8d7da;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #dc3545;
-        }
-    </style>
-""", unsafe_allow_html=True)
+from config_diff import MISSING, apply_merge_patch, diff_paths, format_path, merge_patch, minimize_patch
+
+logger = logging.getLogger(__name__)
+
+_LAZY_IMPORT_LOCK = threading.Lock()
+
+class _LazyModule:
+    """Stands in for module ``name``, importing it on first attribute access.
+
+    The import runs under a lock, so script threads of several sessions hitting
+    it at once on a cold process all wait for the one complete module.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            with _LAZY_IMPORT_LOCK:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# pandas takes most of a cold start and the Streamlit server never imports it; loading it on
+# first use lets the title and sidebar render before the selected page needs a DataFrame
+pd = _LazyModule("pandas")
+np = _LazyModule("numpy")
+SCRIPT_IMPORTED = time.perf_counter()
 
 # --- Vapi API Client Functions ---
-VAPI_BASE_URL = "https://api.vapi.ai"
+VAPI_BASE_URL = os.environ.get("VAPI_BASE_URL", "https://api.vapi.ai")
 REQUEST_TIMEOUT = 10
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_BACKOFF_MAX = 8.0
+RETRY_AFTER_MAX = 60.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_PER_SECOND = 10
+RATE_LIMIT_BURST = 20
 
-def get_headers():
-    """Constructs authorization headers using the secret API key."""
+def get_api_key():
+    """Reads the Vapi API key from Streamlit secrets."""
     try:
         api_key = st.secrets["vapi_api_key"]
         if api_key == "YOUR_VAPI_API_KEY":
             st.error("❌ Please replace 'YOUR_VAPI_API_KEY' in .streamlit/secrets.toml with your actual Vapi API key.")
             return None
-        return {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
+        return api_key
     except KeyError:
         st.error("❌ Vapi API Key not found in Streamlit secrets. Please configure `vapi_api_key`.")
         return None
 
+class TokenBucket:
+    """Thread-safe token bucket pacing requests to ``rate`` per second."""
+
+    def __init__(self, rate=RATE_LIMIT_PER_SECOND, burst=RATE_LIMIT_BURST):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Holds back every caller for ``seconds``, e.g. after a 429."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+def _retry_after(response):
+    """Parses a Retry-After header (seconds or HTTP date) into seconds."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now().astimezone()).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), RETRY_AFTER_MAX)
+
+class SingleFlight:
+    """Coalesces concurrent calls by key, like Go's ``singleflight.Group``.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for it and share its result or exception instead of running
+    it again. Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, func):
+        """Returns ``(result, shared)``, where ``shared`` is True for callers that joined another's call."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = {"done": threading.Event(), "result": None, "error": None}
+        
+        if not leader:
+            flight["done"].wait()
+            if flight["error"] is not None:
+                raise flight["error"]
+            return flight["result"], True
+        
+        try:
+            flight["result"] = func()
+        except BaseException as e:
+            flight["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight["done"].set()
+        return flight["result"], False
+
+class VapiClient:
+    """Keep-alive HTTP client for the Vapi API.
+
+    All helpers share one ``requests.Session`` so connections (and their TLS
+    handshakes) are pooled across calls and reruns, and the auth headers are
+    built once instead of on every request.
+
+    Requests are paced by a shared token bucket. Retryable requests (GETs by
+    default) are retried on connection errors and 5xx responses with
+    exponential backoff and full jitter. A 429 is retried for any method, since
+    the server rejected it unprocessed, after ``Retry-After`` if given; it also
+    pauses the bucket so concurrent callers back off too.
+
+    Identical GETs issued while one is already in flight, e.g. by several
+    sessions rerunning at once, share that request's response.
+    """
+
+    def __init__(self, api_key, base_url=VAPI_BASE_URL, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES,
+                 rate_limiter=None, pool_maxsize=POOL_MAXSIZE, metrics=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.metrics = metrics
+        self._flights = SingleFlight()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+
+    def request(self, method, path, params=None, payload=None, retry=None):
+        """Sends a request and raises ``requests.HTTPError`` on error status codes.
+
+        ``retry`` marks the request as safe to repeat; it defaults to True for GET.
+        """
+        if retry is None:
+            retry = method == "GET"
+        data = json.dumps(payload) if payload is not None else None
+        
+        started = time.perf_counter()
+        attempt = 0
+        response = None
+        try:
+            while True:
+                response = None
+                self.rate_limiter.acquire()
+                try:
+                    response = self.session.request(
+                        method,
+                        f"{self.base_url}{path}",
+                        params=params,
+                        data=data,
+                        timeout=self.timeout
+                    )
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    if not retry or attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt)
+                else:
+                    retryable = response.status_code == 429 or (retry and response.status_code in RETRY_STATUSES)
+                    if not retryable or attempt >= self.max_retries:
+                        response.raise_for_status()
+                        return response
+                    delay = _retry_after(response)
+                    if delay is None:
+                        delay = self._backoff(attempt)
+                    if response.status_code == 429:
+                        self.rate_limiter.pause(delay)
+                attempt += 1
+                time.sleep(delay)
+        finally:
+            # Latency covers rate-limit waits and retries: it is what the caller experienced
+            ended = time.perf_counter()
+            if self.metrics is not None:
+                self.metrics.record_request(method, path, response, ended - started, attempt)
+            profiler = current_profiler()
+            if profiler is not None:
+                profiler.add_span(f"{method} {endpoint_template(path)}", "api", started, ended)
+
+    @staticmethod
+    def _backoff(attempt):
+        return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt))
+
+    def get(self, path, params=None):
+        key = (path, json.dumps(params, sort_keys=True, default=str))
+        response, shared = self._flights.do(key, lambda: self.request("GET", path, params=params))
+        if shared and self.metrics is not None:
+            self.metrics.record_coalesced("GET", path)
+        return response
+
+    def post(self, path, payload):
+        return self.request("POST", path, payload=payload)
+
+    def patch(self, path, payload, retry=False):
+        return self.request("PATCH", path, payload=payload, retry=retry)
+
+    def delete(self, path):
+        return self.request("DELETE", path)
+
+    def close(self):
+        self.session.close()
+
+@st.cache_resource(show_spinner=False)
+def _create_vapi_client(api_key):
+    """One pooled client per API key, shared by every session in the process."""
+    return VapiClient(api_key, metrics=get_request_metrics())
+
+def get_vapi_client():
+    """Returns the shared Vapi client, or None if no API key is configured."""
+    api_key = get_api_key()
+    if not api_key:
+        return None
+    return _create_vapi_client(api_key)
+
 def handle_api_error(e, context="API Call"):
     """Centralized error handling for API requests."""
     if hasattr(e, 'response') and e.response is not None:
@@ -68,54 +298,955 @@ def handle_api_error(e, context="API Call"):
     else:
         st.error(f"❌ {context} Error: {str(e)}")
 
+# --- Request Metrics ---
+METRICS_BUFFER_SIZE = 2000
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def endpoint_template(path):
+    """Collapses ids out of a request path, e.g. ``/call/abc`` -> ``/call/{id}``."""
+    segments = path.split("?")[0].strip("/").split("/")
+    return "/" + "/".join(segments[:1] + ["{id}"] * (len(segments) - 1))
+
+class RequestMetrics:
+    """Thread-safe request and cache instrumentation.
+
+    The last ``buffer_size`` requests are kept in a ring buffer for recent
+    percentiles and inspection; per-endpoint counters and cumulative latency
+    histograms (``LATENCY_BUCKETS`` upper bounds, Prometheus style) cover the
+    whole process lifetime.
+    """
+
+    def __init__(self, buffer_size=METRICS_BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._buffer_size = buffer_size
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self._recent = deque(maxlen=self._buffer_size)
+            self._endpoints = {}
+            self._cache = {}
+
+    def record_request(self, method, path, response, latency, retries):
+        """Records one logical request; ``response`` is None when it failed without one."""
+        status = response.status_code if response is not None else None
+        size = len(response.content) if response is not None else 0
+        endpoint = endpoint_template(path)
+        with self._lock:
+            self._recent.append({
+                "time": time.time(),
+                "method": method,
+                "endpoint": endpoint,
+                "status": status,
+                "bytes": size,
+                "latency": latency,
+                "retries": retries,
+            })
+            stats = self._endpoint_stats(method, endpoint)
+            stats["count"] += 1
+            stats["errors"] += status is None or status >= 400
+            stats["retries"] += retries
+            stats["bytes"] += size
+            stats["latency_sum"] += latency
+            stats["buckets"][bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+            status_key = str(status) if status is not None else "error"
+            stats["statuses"][status_key] = stats["statuses"].get(status_key, 0) + 1
+
+    def _endpoint_stats(self, method, endpoint):
+        stats = self._endpoints.get((method, endpoint))
+        if stats is None:
+            stats = self._endpoints[(method, endpoint)] = {
+                "count": 0, "errors": 0, "retries": 0, "bytes": 0, "latency_sum": 0.0, "coalesced": 0,
+                "buckets": [0] * (len(LATENCY_BUCKETS) + 1), "statuses": {},
+            }
+        return stats
+
+    def record_coalesced(self, method, path):
+        """Counts a request that joined an identical in-flight one instead of being sent."""
+        with self._lock:
+            self._endpoint_stats(method, endpoint_template(path))["coalesced"] += 1
+
+    def record_cache(self, tag, hit):
+        with self._lock:
+            counts = self._cache.setdefault(tag, [0, 0, 0])
+            counts[0 if hit else 1] += 1
+
+    def record_cache_coalesced(self, tag):
+        """Counts a cache miss that waited for another caller's load instead of loading itself."""
+        with self._lock:
+            self._cache.setdefault(tag, [0, 0, 0])[2] += 1
+
+    def recent(self):
+        """Recent requests, oldest first."""
+        with self._lock:
+            return list(self._recent)
+
+    def endpoint_frame(self):
+        """Per-endpoint totals plus p50/p95 latency (ms) over the requests still in the buffer."""
+        with self._lock:
+            totals = [(method, endpoint, dict(stats)) for (method, endpoint), stats in self._endpoints.items()]
+        # Typed explicitly: an empty buffer would give an object column that quantile rejects
+        recent = pd.DataFrame(self.recent(), columns=["method", "endpoint", "latency"]).astype({"latency": "float64"})
+        percentiles = recent.groupby(["method", "endpoint"])["latency"].quantile([0.5, 0.95]).unstack() * 1000
+        
+        rows = []
+        for method, endpoint, stats in totals:
+            p50, p95 = (percentiles.loc[(method, endpoint)].tolist() if (method, endpoint) in percentiles.index
+                        else (np.nan, np.nan))
+            rows.append({
+                "method": method,
+                "endpoint": endpoint,
+                "requests": stats["count"],
+                "coalesced": stats["coalesced"],
+                "errors": stats["errors"],
+                "retries": stats["retries"],
+                "avg_ms": stats["latency_sum"] / stats["count"] * 1000,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "total_s": stats["latency_sum"],
+                "kb": stats["bytes"] / 1024,
+            })
+        frame = pd.DataFrame(rows, columns=["method", "endpoint", "requests", "coalesced", "errors", "retries",
+                                            "avg_ms", "p50_ms", "p95_ms", "total_s", "kb"])
+        return frame.sort_values("total_s", ascending=False, ignore_index=True)
+
+    def latency_histogram(self):
+        """Request counts per latency bucket across all endpoints."""
+        with self._lock:
+            counts = np.sum([stats["buckets"] for stats in self._endpoints.values()], axis=0) if self._endpoints else []
+        labels = [f"≤{bound * 1000:g}ms" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1] * 1000:g}ms"]
+        # An ordered index keeps the buckets in latency order on the chart axis
+        return pd.Series(counts if len(counts) else [0] * len(labels),
+                         index=pd.CategoricalIndex(labels, categories=labels, ordered=True), dtype="int64")
+
+    def cache_frame(self):
+        """Cache hits and misses per tag, and how many misses joined another caller's load."""
+        with self._lock:
+            rows = [{"tag": tag, "hits": hits, "misses": misses, "coalesced": coalesced}
+                    for tag, (hits, misses, coalesced) in sorted(self._cache.items())]
+        frame = pd.DataFrame(rows, columns=["tag", "hits", "misses", "coalesced"])
+        frame["hit_ratio"] = frame["hits"] / (frame["hits"] + frame["misses"])
+        return frame
+
+    def to_json(self, **extra):
+        """Snapshot of every metric as a JSON document, with ``extra`` top-level sections."""
+        with self._lock:
+            endpoints = [{"method": method, "endpoint": endpoint, **stats, "buckets": list(stats["buckets"]),
+                          "statuses": dict(stats["statuses"])}
+                         for (method, endpoint), stats in self._endpoints.items()]
+            cache = {tag: {"hits": hits, "misses": misses, "coalesced": coalesced}
+                     for tag, (hits, misses, coalesced) in self._cache.items()}
+            started_at = self.started_at
+        return json.dumps({
+            "started_at": started_at,
+            "latency_buckets": list(LATENCY_BUCKETS),
+            "endpoints": endpoints,
+            "cache": cache,
+            "recent": self.recent(),
+            **extra,
+        }, indent=2)
+
+    def to_prometheus(self):
+        """Metrics in the Prometheus text exposition format."""
+        with self._lock:
+            endpoints = [(method, endpoint, dict(stats)) for (method, endpoint), stats in self._endpoints.items()]
+            cache = dict(self._cache)
+        lines = [
+            "# HELP vapi_requests_total Vapi API requests by final status.",
+            "# TYPE vapi_requests_total counter",
+        ]
+        for method, endpoint, stats in endpoints:
+            for status, count in stats["statuses"].items():
+                lines.append(f'vapi_requests_total{{method="{method}",endpoint="{endpoint}",status="{status}"}} {count}')
+        lines += [
+            "# HELP vapi_request_duration_seconds Vapi API request latency including retries.",
+            "# TYPE vapi_request_duration_seconds histogram",
+        ]
+        for method, endpoint, stats in endpoints:
+            labels = f'method="{method}",endpoint="{endpoint}"'
+            cumulative = np.cumsum(stats["buckets"])
+            for bound, count in zip(LATENCY_BUCKETS, cumulative):
+                lines.append(f'vapi_request_duration_seconds_bucket{{{labels},le="{bound:g}"}} {count}')
+            lines.append(f'vapi_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats["count"]}')
+            lines.append(f'vapi_request_duration_seconds_sum{{{labels}}} {stats["latency_sum"]:.6f}')
+            lines.append(f'vapi_request_duration_seconds_count{{{labels}}} {stats["count"]}')
+        for name, field, help_text in (("vapi_response_bytes_total", "bytes", "Vapi API response body bytes."),
+                                       ("vapi_request_retries_total", "retries", "Vapi API request retries."),
+                                       ("vapi_requests_coalesced_total", "coalesced",
+                                        "Vapi API GETs that joined an identical in-flight request instead of being sent.")):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for method, endpoint, stats in endpoints:
+                lines.append(f'{name}{{method="{method}",endpoint="{endpoint}"}} {stats[field]}')
+        lines += [
+            "# HELP vapi_cache_requests_total API cache lookups by result.",
+            "# TYPE vapi_cache_requests_total counter",
+        ]
+        for tag, (hits, misses, _) in sorted(cache.items()):
+            lines.append(f'vapi_cache_requests_total{{tag="{tag}",result="hit"}} {hits}')
+            lines.append(f'vapi_cache_requests_total{{tag="{tag}",result="miss"}} {misses}')
+        lines += [
+            "# HELP vapi_cache_loads_coalesced_total API cache misses that waited for a concurrent load of the same key.",
+            "# TYPE vapi_cache_loads_coalesced_total counter",
+        ]
+        for tag, (_, _, coalesced) in sorted(cache.items()):
+            lines.append(f'vapi_cache_loads_coalesced_total{{tag="{tag}"}} {coalesced}')
+        return "\n".join(lines) + "\n"
+
+@st.cache_resource(show_spinner=False)
+def get_request_metrics():
+    """Process-wide request metrics shared by all sessions."""
+    return RequestMetrics()
+
+# --- Startup Report ---
+def _process_started_at():
+    """Wall-clock start of this process from ``/proc`` on Linux, or None elsewhere."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the parenthesized command name start at field 3; starttime is field 22
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+
+class StartupReport:
+    """Time to first render for the process and for each new session, and rerun durations.
+
+    Script runs are timed from ``SCRIPT_STARTED``, before the script's own
+    imports, to the end of ``main()``. The process figure starts at process
+    creation, so it also covers interpreter and server startup: the cold start
+    a user of a freshly scaled container waits through.
+    """
+
+    def __init__(self, buffer_size=METRICS_BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self.process_started_at = _process_started_at()
+        self.process_first_render = None
+        self.first_run = None
+        self._runs = {"session_first_render": deque(maxlen=buffer_size), "rerun": deque(maxlen=buffer_size)}
+        self._totals = {kind: [0, 0.0] for kind in self._runs}
+
+    def record_run(self, script_started, script_imported, ended, first_in_session):
+        """Records one completed script run; ``first_in_session`` marks a session's first render."""
+        duration = ended - script_started
+        kind = "session_first_render" if first_in_session else "rerun"
+        with self._lock:
+            if self.first_run is None:
+                self.first_run = {"imports": script_imported - script_started, "total": duration}
+                if self.process_started_at is not None:
+                    self.process_first_render = time.time() - self.process_started_at
+            self._runs[kind].append(duration)
+            self._totals[kind][0] += 1
+            self._totals[kind][1] += duration
+
+    def summary(self):
+        """Plain-dict snapshot; percentiles cover the last ``buffer_size`` runs of each kind."""
+        with self._lock:
+            runs = {kind: list(durations) for kind, durations in self._runs.items()}
+            totals = {kind: list(total) for kind, total in self._totals.items()}
+            report = {
+                "process_started_at": self.process_started_at,
+                "process_first_render": self.process_first_render,
+                "first_run": dict(self.first_run) if self.first_run else None,
+            }
+        for kind, durations in runs.items():
+            report[kind] = {
+                "count": totals[kind][0],
+                "sum": totals[kind][1],
+                "p50": float(np.percentile(durations, 50)) if durations else None,
+                "p95": float(np.percentile(durations, 95)) if durations else None,
+            }
+        return report
+
+    def to_prometheus(self):
+        """Startup metrics in the Prometheus text exposition format."""
+        report = self.summary()
+        lines = []
+        gauges = (
+            ("vapi_app_process_first_render_seconds", "Seconds from process start to the end of the first script run.",
+             report["process_first_render"]),
+            ("vapi_app_first_run_import_seconds", "Seconds the first script run spent importing modules.",
+             report["first_run"] and report["first_run"]["imports"]),
+        )
+        for name, help_text, value in gauges:
+            if value is not None:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value:.6f}"]
+        for kind, help_text in (("session_first_render", "Script run time of each session's first render."),
+                                ("rerun", "Script run time of reruns after a session's first render.")):
+            name = f"vapi_app_{kind}_seconds"
+            stats = report[kind]
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+            for field, quantile in (("p50", "0.5"), ("p95", "0.95")):
+                if stats[field] is not None:
+                    lines.append(f'{name}{{quantile="{quantile}"}} {stats[field]:.6f}')
+            lines += [f"{name}_sum {stats['sum']:.6f}", f"{name}_count {stats['count']}"]
+        return "\n".join(lines) + "\n"
+
+@st.cache_resource(show_spinner=False)
+def get_startup_report():
+    """Process-wide startup report shared by all sessions."""
+    return StartupReport()
+
+# --- Rerun Profiling ---
+# VAPI_PROFILE=1 turns the sidebar profiling toggle on by default; VAPI_PROFILE=cprofile also enables cProfile
+PROFILE_ENV_VAR = "VAPI_PROFILE"
+PROFILE_TOP_FUNCTIONS = 25
+PROFILE_MAX_SPANS = 300
+
+class RerunProfiler:
+    """Timed spans for one script rerun, optionally under cProfile.
+
+    Spans are offsets from the start of the rerun. Worker threads attached to
+    the rerun's script context (see ``fetch_concurrently``) find the profiler
+    through their session id, so concurrent API calls land on the same
+    waterfall. cProfile only sees the script thread.
+    """
+
+    def __init__(self, started=None, use_cprofile=False):
+        self.started = started or time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+        self._cprofile = cProfile.Profile() if use_cprofile else None
+        self._session_id = None
+
+    def add_span(self, name, category, start, end):
+        with self._lock:
+            self.spans.append((name, category, start - self.started, end - self.started,
+                               threading.current_thread().name))
+
+    @contextmanager
+    def span(self, name, category):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, start, time.perf_counter())
+
+    def activate(self):
+        ctx = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            self._session_id = ctx.session_id
+            _active_profilers()[self._session_id] = self
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def deactivate(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if _active_profilers().get(self._session_id) is self:
+            del _active_profilers()[self._session_id]
+
+    def frame(self):
+        with self._lock:
+            spans = list(self.spans)
+        frame = pd.DataFrame(spans, columns=["name", "category", "start", "end", "thread"])
+        frame["ms"] = (frame["end"] - frame["start"]) * 1000
+        return frame.sort_values("start", ignore_index=True)
+
+    def cprofile_report(self):
+        """Top functions by cumulative time, or None without cProfile."""
+        if self._cprofile is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(self._cprofile, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        return out.getvalue()
+
+@st.cache_resource(show_spinner=False)
+def _active_profilers():
+    """Profilers by session id; a resource, because cached clients keep calling the first rerun's globals."""
+    return {}
+
+def current_profiler():
+    """The profiler of the rerun running on this thread, if profiling is on."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return _active_profilers().get(ctx.session_id) if ctx is not None else None
+
+def profiled(category):
+    """Records calls to the decorated function as ``category`` spans while profiling is on."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = current_profiler()
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.span(func.__name__, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# --- API Cache ---
+VAPI_CACHE_DIR = os.environ.get("VAPI_CACHE_DIR", ".vapi_cache")
+ASSISTANT_CONFIG_TTL = 300
+API_CACHE_MAX_ENTRIES = 1024
+# "memory" keeps each process's cache to itself; any other name is a key of API_CACHE_BACKENDS
+API_CACHE_BACKEND = os.environ.get("VAPI_CACHE_BACKEND", "memory")
+API_CACHE_PATH = os.path.join(VAPI_CACHE_DIR, "api_cache.sqlite3")
+API_CACHE_MAX_BYTES = int(os.environ.get("VAPI_CACHE_MAX_MB", "256")) * 1024 * 1024
+# Shared entries older than this are ignored and purged, whatever TTL a reader asks for
+API_CACHE_MAX_AGE = 24 * 3600
+API_CACHE_EVICT_EVERY = 64
+# Derived, process-local results that are cheaper to rebuild than to share
+API_CACHE_LOCAL_TAGS = frozenset({"call-frame"})
+_ALL_KEYS = object()
+
+class ApiCache:
+    """In-process cache for API results, grouped by tag.
+
+    Entries are addressed by ``(tag, key)`` so a write can evict or patch just
+    the results it affected instead of clearing everything for every user.
+    Loader exceptions propagate and are never cached. Concurrent misses for
+    the same entry run its loader once and share the result. The cache is an
+    LRU bounded to ``max_entries`` across all tags.
+
+    With a ``backend`` (see ``SqliteCacheBackend``), the backend holds the
+    entries of every tag outside ``local_tags`` and every write goes through
+    to it. Memory then only keeps decoded copies, each tagged with the
+    backend's version of the entry and checked against it on lookup, so other
+    processes sharing the backend see each other's writes and invalidations.
+    """
+
+    def __init__(self, max_entries=API_CACHE_MAX_ENTRIES, metrics=None, backend=None,
+                 local_tags=API_CACHE_LOCAL_TAGS):
+        self.max_entries = max_entries
+        self.metrics = metrics
+        self.backend = backend
+        self.local_tags = local_tags
+        # (tag, key) -> (stored_at, value, backend version or None)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def _shared(self, tag):
+        return self.backend is not None and tag not in self.local_tags
+
+    def _get_entry(self, tag, key):
+        if self._shared(tag):
+            return self._get_shared_entry(tag, key)
+        with self._lock:
+            entry = self._entries.get((tag, key))
+            if entry:
+                self._entries.move_to_end((tag, key))
+            return entry
+
+    def _get_shared_entry(self, tag, key):
+        head = self.backend.head(tag, key)
+        if head is not None:
+            with self._lock:
+                entry = self._entries.get((tag, key))
+                if entry is not None and entry[2] == head[1]:
+                    self._entries.move_to_end((tag, key))
+                    return entry
+            # Written by another process, or evicted from memory: decode the backend's copy
+            entry = self.backend.get(tag, key)
+            if entry is not None:
+                self._remember(tag, key, entry)
+                return entry
+        with self._lock:
+            self._entries.pop((tag, key), None)
+        return None
+
+    def _remember(self, tag, key, entry):
+        with self._lock:
+            self._entries[(tag, key)] = entry
+            self._entries.move_to_end((tag, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _fresh(self, tag, key, ttl):
+        entry = self._get_entry(tag, key)
+        if entry is not None and (ttl is None or time.time() - entry[0] < ttl):
+            return entry
+        return None
+
+    def get_or_load(self, tag, key, loader, ttl=None):
+        entry = self._fresh(tag, key, ttl)
+        self.record_lookup(tag, entry is not None)
+        if entry is not None:
+            return entry[1]
+
+        def load():
+            # A flight that finished between the lookup above and this one has already stored it
+            entry = self._fresh(tag, key, ttl)
+            if entry is not None:
+                return entry[1]
+            value = loader()
+            self.set(tag, key, value)
+            return value
+
+        value, shared = self._flights.do((tag, key), load)
+        if shared and self.metrics is not None:
+            self.metrics.record_cache_coalesced(tag)
+        return value
+
+    def record_lookup(self, tag, hit):
+        """Counts a hit or miss, including lookups validated outside ``get_or_load``."""
+        if self.metrics is not None:
+            self.metrics.record_cache(tag, hit)
+
+    def set(self, tag, key, value):
+        stored_at = time.time()
+        version = self.backend.set(tag, key, value, stored_at) if self._shared(tag) else None
+        self._remember(tag, key, (stored_at, value, version))
+
+    def entry(self, tag, key):
+        """Returns ``(stored_at, value)`` without loading, or None."""
+        entry = self._get_entry(tag, key)
+        return entry[:2] if entry else None
+
+    def replace(self, tag, key, value, current):
+        """Stores ``value`` only if the cached value is still ``current`` (by identity); returns whether it did.
+
+        Lets a slow background reload drop its result when a write updated or
+        evicted the entry in the meantime, including a write by another process.
+        """
+        if not self._shared(tag):
+            with self._lock:
+                entry = self._entries.get((tag, key))
+                if entry is None or entry[1] is not current:
+                    return False
+                self._entries[(tag, key)] = (time.time(), value, None)
+                return True
+        with self._lock:
+            entry = self._entries.get((tag, key))
+        if entry is None or entry[1] is not current:
+            return False
+        stored_at = time.time()
+        version = self.backend.replace(tag, key, value, stored_at, entry[2])
+        if version is None:
+            return False
+        self._remember(tag, key, (stored_at, value, version))
+        return True
+
+    def peek(self, tag, key):
+        """Returns a cached value without loading, or None."""
+        entry = self._get_entry(tag, key)
+        return entry[1] if entry else None
+
+    def age(self, tag, key):
+        """Seconds since the entry was stored, or None if it is not cached."""
+        if self._shared(tag):
+            head = self.backend.head(tag, key)
+            return time.time() - head[0] if head else None
+        with self._lock:
+            entry = self._entries.get((tag, key))
+        return time.time() - entry[0] if entry else None
+
+    def values(self, tag):
+        """Returns every cached value under ``tag``."""
+        if self._shared(tag):
+            entries = [self._get_entry(tag, key) for key in self.backend.keys(tag)]
+            return [entry[1] for entry in entries if entry is not None]
+        with self._lock:
+            return [entry[1] for (entry_tag, _), entry in self._entries.items() if entry_tag == tag]
+
+    def invalidate(self, tag, key=_ALL_KEYS):
+        """Evicts one entry, or every entry under ``tag``."""
+        if self._shared(tag):
+            if key is _ALL_KEYS:
+                self.backend.delete_tag(tag)
+            else:
+                self.backend.delete(tag, key)
+        with self._lock:
+            if key is _ALL_KEYS:
+                for entry_key in [k for k in self._entries if k[0] == tag]:
+                    del self._entries[entry_key]
+            else:
+                self._entries.pop((tag, key), None)
+
+    def update(self, tag, func):
+        """Replaces every cached value under ``tag`` with ``func(value)``, keeping its age."""
+        if not self._shared(tag):
+            with self._lock:
+                for entry_key, (stored_at, value, _) in list(self._entries.items()):
+                    if entry_key[0] == tag:
+                        self._entries[entry_key] = (stored_at, func(value), None)
+            return
+        for key in self.backend.keys(tag):
+            entry = self._get_entry(tag, key)
+            if entry is None:
+                continue
+            stored_at, value, version = entry
+            updated = func(value)
+            version = self.backend.replace(tag, key, updated, stored_at, version)
+            # A concurrent write by another process wins; its value is what the next lookup decodes
+            if version is not None:
+                self._remember(tag, key, (stored_at, updated, version))
+
+class SqliteCacheBackend:
+    """``ApiCache`` backend in a SQLite file that every process on the host can share.
+
+    Values are pickled and zlib-compressed. Each write stores a new random
+    ``version``, so a reader can check whether its decoded copy is current
+    with an indexed lookup instead of reading the value. Entries older than
+    ``max_age`` are ignored and purged, and once the stored values exceed
+    ``max_bytes`` the least recently written ones are evicted. Unpickling runs
+    code named in the data, so the file must only be writable by the app.
+
+    A backend implements ``head``, ``get``, ``set``, ``replace``, ``delete``,
+    ``delete_tag``, ``keys`` and ``stats``; register others in
+    ``API_CACHE_BACKENDS``.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=API_CACHE_PATH, max_bytes=API_CACHE_MAX_BYTES, max_age=API_CACHE_MAX_AGE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        # Writers in other processes hold the lock for one short transaction at a time
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    tag TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    version INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    value BLOB NOT NULL,
+                    PRIMARY KEY (tag, key)
+                );
+                CREATE INDEX IF NOT EXISTS entries_by_stored_at ON entries (stored_at);
+            """)
+        self.evict()
+
+    @staticmethod
+    def _encode(value):
+        return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def _new_version():
+        # Not the random module: forked workers would share its state and could repeat versions
+        return int.from_bytes(os.urandom(8), "big") >> 1
+
+    def _oldest(self):
+        return time.time() - self.max_age
+
+    def head(self, tag, key):
+        """``(stored_at, version)`` of an entry, or None."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT stored_at, version FROM entries WHERE tag = ? AND key = ? AND stored_at > ?",
+                (tag, repr(key), self._oldest())
+            ).fetchone()
+
+    def get(self, tag, key):
+        """``(stored_at, value, version)`` of an entry, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stored_at, version, value FROM entries WHERE tag = ? AND key = ? AND stored_at > ?",
+                (tag, repr(key), self._oldest())
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            value = pickle.loads(zlib.decompress(row[2]))
+        except Exception:
+            # Written by an incompatible version of the app; treat it as a miss
+            self.delete(tag, key)
+            return None
+        return row[0], value, row[1]
+
+    def set(self, tag, key, value, stored_at):
+        """Stores ``value``, returning its new version."""
+        data = self._encode(value)
+        version = self._new_version()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (tag, key, stored_at, version, size, value) VALUES (?, ?, ?, ?, ?, ?)",
+                (tag, repr(key), stored_at, version, len(data), data)
+            )
+        self._wrote()
+        return version
+
+    def replace(self, tag, key, value, stored_at, version):
+        """Stores ``value`` only if the entry is still at ``version``; returns the new version, or None."""
+        data = self._encode(value)
+        new_version = self._new_version()
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE entries SET stored_at = ?, version = ?, size = ?, value = ? "
+                "WHERE tag = ? AND key = ? AND version = ?",
+                (stored_at, new_version, len(data), data, tag, repr(key), version)
+            ).rowcount
+        if not updated:
+            return None
+        self._wrote()
+        return new_version
+
+    def delete(self, tag, key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE tag = ? AND key = ?", (tag, repr(key)))
+
+    def delete_tag(self, tag):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE tag = ?", (tag,))
+
+    def keys(self, tag):
+        """Keys of the live entries under ``tag``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM entries WHERE tag = ? AND stored_at > ?", (tag, self._oldest())
+            ).fetchall()
+        # Keys are None, numbers, strings or tuples of them, so their repr round-trips
+        return [ast.literal_eval(row[0]) for row in rows]
+
+    def stats(self):
+        """Entry count and total compressed bytes."""
+        with self._lock:
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": size}
+
+    def _wrote(self):
+        with self._lock:
+            self._writes += 1
+            due = self._writes % API_CACHE_EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Purges expired entries, then the least recently written ones until under 90% of ``max_bytes``."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE stored_at <= ?", (self._oldest(),))
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            excess = total - self.max_bytes * 0.9
+            cutoff = None
+            for stored_at, size in self._conn.execute("SELECT stored_at, size FROM entries ORDER BY stored_at"):
+                excess -= size
+                cutoff = stored_at
+                if excess <= 0:
+                    break
+            self._conn.execute("DELETE FROM entries WHERE stored_at <= ?", (cutoff,))
+
+API_CACHE_BACKENDS = {
+    "sqlite": SqliteCacheBackend,
+}
+
+@st.cache_resource(show_spinner=False)
+def get_api_cache():
+    """Process-wide API cache shared by all sessions, and by every worker on the host with a shared backend."""
+    if API_CACHE_BACKEND == "memory":
+        backend = None
+    elif API_CACHE_BACKEND in API_CACHE_BACKENDS:
+        backend = API_CACHE_BACKENDS[API_CACHE_BACKEND]()
+    else:
+        raise ValueError(f"Unknown VAPI_CACHE_BACKEND {API_CACHE_BACKEND!r}; "
+                         f"expected memory or one of {', '.join(API_CACHE_BACKENDS)}")
+    return ApiCache(metrics=get_request_metrics(), backend=backend)
+
+def _replace_by_id(items, updated):
+    return [updated if item.get('id') == updated.get('id') else item for item in items]
+
+def _remove_by_id(items, item_id):
+    return [item for item in items if item.get('id') != item_id]
+
+# --- Background Refresh ---
+LISTING_REFRESH_INTERVAL = 60
+# Older listings are reloaded before being served rather than shown stale
+LISTING_MAX_STALE = 3600
+# Listings nobody has read for this long are no longer refreshed
+LISTING_IDLE_AFTER = 900
+
+class ListingRefresher:
+    """Stale-while-revalidate for the API listings, backed by the shared ``ApiCache``.
+
+    ``get`` returns a cached listing right away, whatever its age up to
+    ``LISTING_MAX_STALE``. A background thread revalidates every listing read
+    in the last ``idle_after`` seconds once per ``interval``, and a read of an
+    older listing wakes it early. Only the first read of a listing, or one
+    evicted from the cache, waits on the network. A failed refresh keeps
+    serving the last good value and is reported by ``error``.
+    """
+
+    def __init__(self, cache, interval=LISTING_REFRESH_INTERVAL, idle_after=LISTING_IDLE_AFTER):
+        self.cache = cache
+        self.interval = interval
+        self.idle_after = idle_after
+        self._listings = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="listing-refresh", daemon=True)
+        self._thread.start()
+
+    def get(self, tag, key, loader):
+        """Returns the cached listing, loading it synchronously only when there is none to serve."""
+        with self._lock:
+            listing = self._listings.setdefault((tag, key), {"error": None})
+            listing.update(load=loader, read_at=time.time())
+        entry = self.cache.entry(tag, key)
+        if entry is None or time.time() - entry[0] > LISTING_MAX_STALE:
+            return self.cache.get_or_load(tag, key, loader, ttl=LISTING_MAX_STALE)
+        self.cache.record_lookup(tag, True)
+        if time.time() - entry[0] > self.interval:
+            self._wake.set()
+        return entry[1]
+
+    def error(self, tag, key):
+        """Why the last background refresh of a listing failed, or None."""
+        with self._lock:
+            listing = self._listings.get((tag, key))
+            return listing["error"] if listing else None
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            now = time.time()
+            with self._lock:
+                active = [(tag, key, listing["load"]) for (tag, key), listing in self._listings.items()
+                          if now - listing["read_at"] < self.idle_after]
+            for tag, key, load in active:
+                try:
+                    entry = self.cache.entry(tag, key)
+                    # Absent entries are left to the next reader; half an interval absorbs timer jitter
+                    if entry is not None and now - entry[0] >= self.interval / 2:
+                        self._refresh(tag, key, entry[1], load)
+                except Exception as e:
+                    # The thread is never restarted, so nothing may end it; the error shows in the listing's caption
+                    self._set_error(tag, key, f"{type(e).__name__}: {e}")
+
+    def _refresh(self, tag, key, current, load):
+        try:
+            value = load()
+        except requests.exceptions.RequestException as e:
+            self._set_error(tag, key, describe_api_error(e))
+            return
+        self.cache.replace(tag, key, value, current)
+        self._set_error(tag, key, None)
+
+    def _set_error(self, tag, key, error):
+        with self._lock:
+            self._listings[(tag, key)]["error"] = error
+
+@st.cache_resource(show_spinner=False)
+def get_listing_refresher():
+    """Process-wide listing refresher shared by all sessions."""
+    return ListingRefresher(get_api_cache())
+
+def format_age(seconds):
+    """``42`` -> ``"42s"``, ``300`` -> ``"5m"``, ``7200`` -> ``"2h"``."""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds // 60:.0f}m"
+    return f"{seconds // 3600:.0f}h"
+
+def render_listing_age(tag, key=None):
+    """Caption with how long ago a cached listing was refreshed, and any background refresh error."""
+    age = get_api_cache().age(tag, key)
+    if age is None:
+        return
+    caption = f"🕒 Last refreshed {format_age(age)} ago"
+    error = get_listing_refresher().error(tag, key)
+    if error:
+        caption += f" · ⚠️ background refresh failed: {error}"
+    st.caption(caption)
+
 # --- Assistant Management ---
-@st.cache_data(ttl=300)
+# Server-managed fields, never sent back in a create or update
+CONFIG_SYSTEM_FIELDS = ('id', 'orgId', 'createdAt', 'updatedAt')
+
 def list_assistants(limit=100):
     """Fetches all assistants from Vapi API."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return []
     
-    url = f"{VAPI_BASE_URL}/assistant"
-    params = {"limit": limit}
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        return get_listing_refresher().get(
+            "assistants", limit, lambda: client.get("/assistant", params={"limit": limit}).json()
+        )
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Listing Assistants")
         return []
 
+def _listed_updated_at(cache, assistant_id):
+    """Looks up an assistant's ``updatedAt`` in any cached listing."""
+    for agents in cache.values("assistants"):
+        for agent in agents:
+            if agent.get('id') == assistant_id:
+                return agent.get('updatedAt')
+    return None
+
+def _fetch_assistant_config(client, cache, assistant_id):
+    """Returns a cached config if it is still current, else fetches it. Raises on request errors."""
+    # One read for value and age, so an eviction in between cannot leave one without the other
+    entry = cache.entry("assistant-config", assistant_id)
+    if entry is not None:
+        stored_at, config = entry
+        listed_updated_at = _listed_updated_at(cache, assistant_id)
+        if listed_updated_at is not None:
+            if listed_updated_at == config.get('updatedAt'):
+                cache.record_lookup("assistant-config", True)
+                return config
+        elif time.time() - stored_at < ASSISTANT_CONFIG_TTL:
+            cache.record_lookup("assistant-config", True)
+            return config
+    
+    cache.record_lookup("assistant-config", False)
+    config = client.get(f"/assistant/{assistant_id}").json()
+    cache.set("assistant-config", assistant_id, config)
+    record_config_revision(config, "loaded")
+    return config
+
+def _patch_assistant(client, cache, assistant_id, payload):
+    updated = client.patch(f"/assistant/{assistant_id}", payload, retry=True).json()
+    cache.set("assistant-config", assistant_id, updated)
+    record_config_revision(updated, "saved")
+    cache.update("assistants", lambda agents: _replace_by_id(agents, updated))
+    return updated
+
+def _create_assistant(client, cache, payload):
+    created = client.post("/assistant", payload).json()
+    cache.invalidate("assistants")
+    return created
+
+def _delete_assistant(client, cache, assistant_id):
+    client.delete(f"/assistant/{assistant_id}")
+    cache.invalidate("assistant-config", assistant_id)
+    cache.update("assistants", lambda agents: _remove_by_id(agents, assistant_id))
+
+def _clone_payload(config, new_name=None):
+    """Copies a config without its system fields, ready to POST as a new assistant."""
+    payload = {key: value for key, value in config.items() if key not in CONFIG_SYSTEM_FIELDS}
+    payload['name'] = new_name or f"{config.get('name', 'Assistant')} (Copy)"
+    return payload
+
 def get_assistant_config(assistant_id):
-    """Fetches configuration for a specific assistant."""
-    headers = get_headers()
-    if not headers:
+    """Fetches configuration for a specific assistant.
+
+    Configs are cached and revalidated against the ``updatedAt`` in the cached
+    assistant listing, so the full config is only refetched when it changed.
+    Without a listing to compare against, cached configs expire after
+    ``ASSISTANT_CONFIG_TTL``.
+    """
+    client = get_vapi_client()
+    if not client:
         return None
     
-    url = f"{VAPI_BASE_URL}/assistant/{assistant_id}"
     try:
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        return _fetch_assistant_config(client, get_api_cache(), assistant_id)
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Fetching Assistant Config")
         return None
 
 def update_assistant_config(assistant_id, payload):
     """Updates assistant configuration."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return False
     
-    url = f"{VAPI_BASE_URL}/assistant/{assistant_id}"
     try:
-        response = requests.patch(
-            url,
-            headers=headers,
-            data=json.dumps(payload),
-            timeout=REQUEST_TIMEOUT
-        )
-        response.raise_for_status()
+        _patch_assistant(client, get_api_cache(), assistant_id, payload)
         st.success(f"✅ Successfully updated agent {assistant_id[:12]}...")
         return True
     except requests.exceptions.RequestException as e:
@@ -124,20 +1255,12 @@ def update_assistant_config(assistant_id, payload):
 
 def create_assistant(payload):
     """Creates a new assistant."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return None
     
-    url = f"{VAPI_BASE_URL}/assistant"
     try:
-        response = requests.post(
-            url,
-            headers=headers,
-            data=json.dumps(payload),
-            timeout=REQUEST_TIMEOUT
-        )
-        response.raise_for_status()
-        return response.json()
+        return _create_assistant(client, get_api_cache(), payload)
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Creating Assistant")
         return None
@@ -148,100 +1271,1019 @@ def clone_assistant(assistant_id, new_name=None):
     if not config:
         return None
     
-    # Remove system fields
-    fields_to_remove = ['id', 'orgId', 'createdAt', 'updatedAt']
-    for field in fields_to_remove:
-        config.pop(field, None)
-    
-    # Update name
-    if new_name:
-        config['name'] = new_name
-    else:
-        config['name'] = f"{config.get('name', 'Assistant')} (Copy)"
-    
-    return create_assistant(config)
+    return create_assistant(_clone_payload(config, new_name))
 
 def delete_assistant(assistant_id):
     """Deletes an assistant."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return False
     
-    url = f"{VAPI_BASE_URL}/assistant/{assistant_id}"
     try:
-        response = requests.delete(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
+        _delete_assistant(client, get_api_cache(), assistant_id)
         return True
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Deleting Assistant")
         return False
 
+# --- Bulk Assistant Operations ---
+BULK_MAX_WORKERS = 8
+
+def describe_api_error(e):
+    """One-line description of a failed request, for per-item result tables."""
+    if getattr(e, 'response', None) is not None:
+        return f"HTTP {e.response.status_code}: {e.response.text[:200]}"
+    return str(e)
+
+def bulk_patch(edits):
+    """Bulk operation applying editor-shaped ``edits``; only changed fields are sent per assistant."""
+    def apply(client, cache, assistant_id):
+        config = _fetch_assistant_config(client, cache, assistant_id)
+        payload = build_assistant_payload(config, edits)
+        if not payload:
+            return "unchanged"
+        _patch_assistant(client, cache, assistant_id, payload)
+        return f"updated {', '.join(sorted(payload))}"
+    return apply
+
+def bulk_clone(client, cache, assistant_id):
+    config = _fetch_assistant_config(client, cache, assistant_id)
+    return f"cloned as {_create_assistant(client, cache, _clone_payload(config)).get('id')}"
+
+def bulk_delete(client, cache, assistant_id):
+    _delete_assistant(client, cache, assistant_id)
+    return "deleted"
+
+def run_bulk_operation(operation, assistant_ids, max_workers=BULK_MAX_WORKERS, on_progress=None):
+    """Applies ``operation(client, cache, assistant_id)`` to each id on a bounded worker pool.
+
+    Returns ``{assistant_id: {"ok", "result", "error"}}``; one item failing does
+    not stop the others. ``on_progress(done, total, assistant_id, outcome)`` is
+    called from the calling thread as items finish, so it may update the page.
+    """
+    client = get_vapi_client()
+    if not client:
+        return {}
+    
+    cache = get_api_cache()
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(operation, client, cache, assistant_id): assistant_id for assistant_id in assistant_ids}
+        for done, future in enumerate(as_completed(futures), 1):
+            assistant_id = futures[future]
+            try:
+                outcome = {"ok": True, "result": future.result(), "error": None}
+            except requests.exceptions.RequestException as e:
+                outcome = {"ok": False, "result": None, "error": describe_api_error(e)}
+            except Exception as e:
+                # Anything else, e.g. a config the payload builder cannot handle, fails just this item
+                outcome = {"ok": False, "result": None, "error": f"{type(e).__name__}: {e}"}
+            results[assistant_id] = outcome
+            if on_progress:
+                on_progress(done, len(futures), assistant_id, outcome)
+    return results
+
 # --- Call Management ---
-def list_calls(assistant_id=None, limit=100):
-    """Fetches recent calls."""
-    headers = get_headers()
-    if not headers:
-        return []
-    
-    url = f"{VAPI_BASE_URL}/call"
-    params = {"limit": limit}
+CALL_PAGE_SIZE = 100
+MAX_CALL_PAGE_SIZE = 1000
+
+def _to_iso(value):
+    """Normalizes a datetime or ISO string for createdAt query bounds."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _utc_iso(value):
+    """Like ``_to_iso``, converting datetimes to UTC so prefixes line up with the UTC rollup buckets."""
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat()
+    return value
+
+def _iter_call_pages(client, assistant_id=None, since=None, until=None, page_size=CALL_PAGE_SIZE):
+    """Pages through /call newest-first, raising on request errors.
+
+    Each request asks for calls created at or before the oldest ``createdAt``
+    seen so far, and calls already yielded at that boundary are skipped, so
+    pages neither overlap nor drop calls that share a timestamp. A timestamp
+    shared by more calls than fit on a page is fetched whole with one
+    ``MAX_CALL_PAGE_SIZE`` request before stepping past it; should even that
+    overflow, the rest of the group cannot be paged to and a warning is logged.
+    """
+    params = {"limit": page_size}
     if assistant_id:
         params["assistantId"] = assistant_id
+    if since:
+        params["createdAtGe"] = _to_iso(since)
+    if until:
+        params["createdAtLe"] = _to_iso(until)
+    boundary_ids = set()
+    
+    while True:
+        page = client.get("/call", params=params).json()
+        fresh = [call for call in page if call.get('id') not in boundary_ids]
+        if fresh:
+            yield fresh
+        if len(page) < page_size:
+            return
+        
+        cursor = params.pop("createdAtLe", None) or params.pop("createdAtLt", None)
+        if not fresh:
+            # More calls share one createdAt than fit on a page
+            group_page = client.get("/call", params={**params, "createdAtLe": cursor, "limit": MAX_CALL_PAGE_SIZE}).json()
+            group = [call for call in group_page if call['createdAt'] == cursor]
+            if len(group) >= MAX_CALL_PAGE_SIZE:
+                logger.warning("More than %d calls were created at %s; calls past the first %d are skipped",
+                               MAX_CALL_PAGE_SIZE, cursor, MAX_CALL_PAGE_SIZE)
+            rest = [call for call in group if call.get('id') not in boundary_ids]
+            if rest:
+                yield rest
+            params["createdAtLt"] = cursor
+            boundary_ids = set()
+            continue
+        
+        oldest = min(call['createdAt'] for call in page)
+        at_oldest = {call['id'] for call in page if call['createdAt'] == oldest}
+        boundary_ids = at_oldest | boundary_ids if oldest == cursor else at_oldest
+        params["createdAtLe"] = oldest
+
+# --- Local Call Store ---
+CALL_STORE_PATH = os.path.join(VAPI_CACHE_DIR, "calls.sqlite3")
+CALL_BACKFILL_DAYS = 30
+CALL_RECHECK_WINDOW = timedelta(hours=2)
+CALL_SYNC_INTERVAL = 30
+CALL_DETAILS_ACTIVE_TTL = 30
+# Upper bounds (seconds) of the per-bucket duration histogram used for rollup percentiles
+ROLLUP_DURATION_BINS = [5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300, 420, 600, 900, 1200, 1800, 2700, 3600, 7200]
+PREFETCH_WORKERS = 4
+PREFETCH_PAGE_SIZE = 50
+
+def _parse_created_at(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+class CallStore:
+    """Persistent local copy of /call keyed by call id.
+
+    Syncs are incremental: only calls created after the last complete sync
+    started are fetched, minus ``CALL_RECHECK_WINDOW`` so calls that were still
+    in progress get their final status on a later sync. That watermark only
+    moves when a sync reaches its end, so an interrupted sync, whose pages run
+    newest first, is picked up again from the same point.
+
+    Transcripts from synced calls and fetched call details are indexed in an
+    FTS5 table sharing the calls' rowids.
+
+    Hourly per-assistant rollups (count, duration histogram, cost, ended
+    reasons) are recomputed for the hours each upsert touches, so trend
+    queries aggregate a few thousand rollup rows instead of raw calls.
+    """
+
+    def __init__(self, path=CALL_STORE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.last_synced = 0.0
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS calls (
+                    id TEXT PRIMARY KEY,
+                    assistant_id TEXT,
+                    status TEXT,
+                    created_at TEXT NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS calls_by_created_at ON calls (created_at);
+                CREATE INDEX IF NOT EXISTS calls_by_assistant ON calls (assistant_id, created_at);
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    name TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+            """)
+            has_index = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'call_transcripts'"
+            ).fetchone()
+            has_rollups = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'call_rollups_hourly'"
+            ).fetchone()
+            histogram_columns = ", ".join(f"h{i} INTEGER NOT NULL" for i in range(len(ROLLUP_DURATION_BINS)))
+            for table in ("call_rollups_hourly", "call_rollups_daily"):
+                self._conn.executescript(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        assistant_id TEXT NOT NULL,
+                        bucket TEXT NOT NULL,
+                        calls INTEGER NOT NULL,
+                        total_duration INTEGER NOT NULL,
+                        cost REAL NOT NULL,
+                        {histogram_columns},
+                        PRIMARY KEY (assistant_id, bucket)
+                    );
+                    CREATE INDEX IF NOT EXISTS {table}_by_bucket ON {table} (bucket);
+                """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS call_rollup_reasons (
+                    assistant_id TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    ended_reason TEXT NOT NULL,
+                    calls INTEGER NOT NULL,
+                    PRIMARY KEY (assistant_id, bucket, ended_reason)
+                )
+            """)
+            if not has_rollups:
+                self._refresh_rollups()
+            if not has_index:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE call_transcripts USING fts5(transcript, tokenize='porter unicode61')"
+                )
+                # Index whatever an older store already holds
+                self._conn.execute("""
+                    INSERT INTO call_transcripts (rowid, transcript)
+                    SELECT rowid, transcript FROM (
+                        SELECT rowid, COALESCE(json_extract(data, '$.transcript'),
+                                               json_extract(data, '$.artifact.transcript')) AS transcript
+                        FROM calls
+                    ) WHERE transcript IS NOT NULL AND transcript != ''
+                """)
+
+    def upsert(self, calls):
+        """Inserts or refreshes calls; ``version`` only moves when a row actually changed."""
+        rows = [
+            (call['id'], call.get('assistantId'), call.get('status'), call['createdAt'], json.dumps(call))
+            for call in calls if call.get('id') and call.get('createdAt')
+        ]
+        with self._lock, self._conn:
+            changes_before = self._conn.total_changes
+            self._conn.executemany("""
+                INSERT INTO calls (id, assistant_id, status, created_at, data) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    assistant_id = excluded.assistant_id,
+                    status = excluded.status,
+                    created_at = excluded.created_at,
+                    data = excluded.data
+                WHERE data != excluded.data
+            """, rows)
+            if self._conn.total_changes != changes_before:
+                self._bump_version()
+                self._refresh_rollups({(call.get('assistantId') or '', call['createdAt'][:13]) for call in calls
+                                       if call.get('id') and call.get('createdAt')})
+            self._index_transcripts(calls)
+        return len(rows)
+
+    def _bump_version(self):
+        """Moves ``version`` within the caller's transaction. The caller holds the lock."""
+        self._conn.execute("""
+            INSERT INTO sync_state (name, value) VALUES ('version', '1')
+            ON CONFLICT(name) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        """)
+
+    @property
+    def version(self):
+        """Counter of changes to the stored calls.
+
+        Kept in the database rather than in memory, because every worker on the
+        host shares the file and a sync by one must show up in the others' frames.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE name = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    _ROLLUP_SOURCE = """
+        SELECT COALESCE(assistant_id, ''), substr(created_at, 1, 13),
+               json_extract(data, '$.duration'), json_extract(data, '$.startedAt'),
+               json_extract(data, '$.endedAt'), json_extract(data, '$.cost'),
+               json_extract(data, '$.endedReason')
+        FROM calls
+    """
+
+    def _refresh_rollups(self, keys=None):
+        """Recomputes hourly rollups for ``(assistant_id, hour)`` keys (all when None), then their days.
+
+        Ended reasons are kept per hour as well. The caller holds the lock.
+        """
+        if keys is None:
+            rows = self._conn.execute(self._ROLLUP_SOURCE).fetchall()
+        else:
+            rows = []
+            for assistant_id, hour in keys:
+                # Every createdAt in the hour starts with "YYYY-MM-DDTHH:"; ";" sorts right after ":"
+                rows += self._conn.execute(
+                    self._ROLLUP_SOURCE + " WHERE assistant_id IS ? AND created_at >= ? AND created_at < ?",
+                    (assistant_id or None, hour + ":", hour + ";")
+                ).fetchall()
+        
+        buckets = {}
+        reasons = {}
+        for assistant_id, hour, duration, started_at, ended_at, cost, ended_reason in rows:
+            bucket = buckets.setdefault((assistant_id, hour), [0, 0, 0.0] + [0] * len(ROLLUP_DURATION_BINS))
+            bucket[0] += 1
+            bucket[2] += cost or 0.0
+            if duration is None and started_at and ended_at:
+                duration = (_parse_created_at(ended_at) - _parse_created_at(started_at)).total_seconds()
+            if duration is not None:
+                bucket[1] += int(duration)
+                bin_index = min(bisect.bisect_left(ROLLUP_DURATION_BINS, duration), len(ROLLUP_DURATION_BINS) - 1)
+                bucket[3 + bin_index] += 1
+            if ended_reason:
+                reason_key = (assistant_id, hour, ended_reason)
+                reasons[reason_key] = reasons.get(reason_key, 0) + 1
+        
+        placeholders = ", ".join("?" * (5 + len(ROLLUP_DURATION_BINS)))
+        self._conn.executemany(f"INSERT OR REPLACE INTO call_rollups_hourly VALUES ({placeholders})",
+                               [key + tuple(values) for key, values in buckets.items()])
+        self._conn.executemany("DELETE FROM call_rollup_reasons WHERE assistant_id = ? AND bucket = ?", list(buckets))
+        self._conn.executemany("INSERT INTO call_rollup_reasons VALUES (?, ?, ?, ?)",
+                               [key + (count,) for key, count in reasons.items()])
+        
+        # Days are re-summed from their (at most 24) hourly rows
+        sums = ", ".join(["SUM(calls)", "SUM(total_duration)", "SUM(cost)"]
+                         + [f"SUM(h{i})" for i in range(len(ROLLUP_DURATION_BINS))])
+        daily = f"""
+            INSERT OR REPLACE INTO call_rollups_daily
+            SELECT assistant_id, substr(bucket, 1, 10), {sums} FROM call_rollups_hourly
+        """
+        if keys is None:
+            self._conn.execute(daily + " GROUP BY assistant_id, substr(bucket, 1, 10)")
+        else:
+            days = {(assistant_id, hour[:10]) for assistant_id, hour in buckets}
+            self._conn.executemany(daily + " WHERE assistant_id = ? AND bucket >= ? AND bucket < ?",
+                                   [(assistant_id, day, day + "U") for assistant_id, day in days])
+
+    @profiled("store")
+    def rollups(self, since, granularity="day", assistant_id=None):
+        """Trend buckets (UTC days or hours) from ``since``, read from the rollup tables.
+
+        Returns a frame indexed by bucket start with calls, total_duration,
+        cost and an approximate p95_duration interpolated from the merged
+        duration histograms.
+        """
+        table = "call_rollups_daily" if granularity == "day" else "call_rollups_hourly"
+        histogram_columns = [f"h{i}" for i in range(len(ROLLUP_DURATION_BINS))]
+        sums = ", ".join(["SUM(calls)", "SUM(total_duration)", "SUM(cost)"] + [f"SUM({column})" for column in histogram_columns])
+        sql = f"SELECT bucket, {sums} FROM {table} WHERE bucket >= ?"
+        params = [_utc_iso(since)[:10 if granularity == "day" else 13]]
+        if assistant_id:
+            sql += " AND assistant_id = ?"
+            params.append(assistant_id)
+        sql += " GROUP BY bucket ORDER BY bucket"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        
+        frame = pd.DataFrame.from_records(rows, columns=["bucket", "calls", "total_duration", "cost"] + histogram_columns)
+        histograms = frame[histogram_columns].to_numpy(dtype="float64")
+        frame = frame[["bucket", "calls", "total_duration", "cost"]]
+        frame["p95_duration"] = _histogram_percentile(histograms, 0.95)
+        frame.index = pd.to_datetime(frame.pop("bucket"), utc=True, format="%Y-%m-%d" if granularity == "day" else "%Y-%m-%dT%H")
+        return frame
+
+    @profiled("store")
+    def ended_reason_totals(self, since, assistant_id=None):
+        """Call counts per ended reason from ``since``, most frequent first."""
+        sql = "SELECT ended_reason, SUM(calls) FROM call_rollup_reasons WHERE bucket >= ?"
+        params = [_utc_iso(since)[:13]]
+        if assistant_id:
+            sql += " AND assistant_id = ?"
+            params.append(assistant_id)
+        sql += " GROUP BY ended_reason ORDER BY SUM(calls) DESC"
+        with self._lock:
+            return pd.Series(dict(self._conn.execute(sql, params).fetchall()), dtype="int64")
+
+    def _index_transcripts(self, calls):
+        self._conn.executemany("""
+            INSERT OR REPLACE INTO call_transcripts (rowid, transcript)
+            SELECT rowid, ? FROM calls WHERE id = ?
+        """, [(get_transcript(call), call['id']) for call in calls if call.get('id') and get_transcript(call)])
+
+    def index_transcripts(self, calls):
+        """Indexes transcripts from fetched call details, adding calls the store has not synced yet."""
+        rows = [
+            (call['id'], call.get('assistantId'), call.get('status'), call['createdAt'], json.dumps(call))
+            for call in calls if call.get('id') and call.get('createdAt')
+        ]
+        with self._lock, self._conn:
+            changes_before = self._conn.total_changes
+            self._conn.executemany("""
+                INSERT INTO calls (id, assistant_id, status, created_at, data) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO NOTHING
+            """, rows)
+            if self._conn.total_changes != changes_before:
+                self._bump_version()
+                # Recomputing an hour is idempotent, so the hours of calls already stored can be included
+                self._refresh_rollups({(assistant_id or '', created_at[:13]) for _, assistant_id, _, created_at, _ in rows})
+            self._index_transcripts(calls)
+
+    @profiled("store")
+    def search_transcripts(self, query, assistant_id=None, limit=50):
+        """Full-text search over indexed transcripts, best matches first.
+
+        ``query`` uses FTS5 syntax; raises ``sqlite3.OperationalError`` if it is malformed.
+        """
+        sql = """
+            SELECT calls.id, calls.assistant_id, calls.status, calls.created_at,
+                   snippet(call_transcripts, 0, '**', '**', ' … ', 16)
+            FROM call_transcripts JOIN calls ON calls.rowid = call_transcripts.rowid
+            WHERE call_transcripts MATCH ?
+        """
+        params = [query]
+        if assistant_id:
+            sql += " AND calls.assistant_id = ?"
+            params.append(assistant_id)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def transcript_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM call_transcripts").fetchone()[0]
+
+    def unindexed_call_ids(self, limit):
+        """Most recent calls with no indexed transcript, to fetch details for."""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT id FROM calls WHERE rowid NOT IN (SELECT rowid FROM call_transcripts)
+                ORDER BY created_at DESC LIMIT ?
+            """, (limit,)).fetchall()
+        return [call_id for (call_id,) in rows]
+
+    def synced_through(self):
+        """When the last complete sync started, or None if none has finished."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE name = 'synced_through'").fetchone()
+        return _parse_created_at(row[0]) if row else None
+
+    def calls(self, assistant_id=None, limit=None):
+        """Returns stored calls newest first, optionally for one assistant."""
+        query = "SELECT data FROM calls"
+        params = []
+        if assistant_id:
+            query += " WHERE assistant_id = ?"
+            params.append(assistant_id)
+        query += " ORDER BY created_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def frame_records(self):
+        """Returns every stored call as a tuple of ``CALL_FRAME_FIELDS`` values, newest first.
+
+        Fields are pulled with ``json_extract`` so SQLite does the parsing
+        instead of ``json.loads`` on every document.
+        """
+        columns = ", ".join(f"json_extract(data, '$.{field}')" for field in CALL_FRAME_FIELDS)
+        with self._lock:
+            return self._conn.execute(f"SELECT {columns} FROM calls ORDER BY created_at DESC").fetchall()
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM calls").fetchone()[0]
+
+    def sync(self, client):
+        """Fetches calls newer than the stored watermark, yielding the size of each synced page.
+
+        Concurrent syncs are skipped rather than queued, since the running one
+        already covers the same window.
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            started = datetime.now(timezone.utc)
+            synced_through = self.synced_through()
+            if synced_through:
+                since = synced_through - CALL_RECHECK_WINDOW
+            else:
+                since = started - timedelta(days=CALL_BACKFILL_DAYS)
+            for page in _iter_call_pages(client, since=since):
+                yield self.upsert(page)
+            # Only now is everything created before ``started`` stored; a sync closed or failing
+            # mid-way leaves the watermark where it was
+            with self._lock, self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO sync_state (name, value) VALUES ('synced_through', ?)",
+                                   (started.isoformat(),))
+            self.last_synced = time.time()
+        finally:
+            self._sync_lock.release()
+
+    def is_stale(self, max_age=CALL_SYNC_INTERVAL):
+        return time.time() - self.last_synced > max_age
+
+def _histogram_percentile(histograms, quantile):
+    """Per-row percentile estimate from ``ROLLUP_DURATION_BINS`` histograms, interpolating within the bin."""
+    if not len(histograms):
+        return np.zeros(0)
+    upper = np.array(ROLLUP_DURATION_BINS, dtype="float64")
+    lower = np.concatenate(([0.0], upper[:-1]))
+    totals = histograms.sum(axis=1)
+    cumulative = histograms.cumsum(axis=1)
+    target = totals * quantile
+    bin_index = np.minimum((cumulative < target[:, None]).sum(axis=1), len(upper) - 1)
+    rows = np.arange(len(histograms))
+    below = np.where(bin_index > 0, cumulative[rows, bin_index - 1], 0.0)
+    in_bin = histograms[rows, bin_index]
+    fraction = np.divide(target - below, in_bin, out=np.zeros_like(target), where=in_bin > 0)
+    estimate = lower[bin_index] + fraction * (upper[bin_index] - lower[bin_index])
+    return np.where(totals > 0, estimate, np.nan)
+
+@st.cache_resource(show_spinner=False)
+def get_call_store():
+    """Process-wide local call store."""
+    return CallStore()
+
+def sync_calls(force=False):
+    """Delta-syncs the local call store, yielding the number of calls in each synced page."""
+    store = get_call_store()
+    if not force and not store.is_stale():
+        return
+    client = get_vapi_client()
+    if not client:
+        return
     
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        yield from store.sync(client)
     except requests.exceptions.RequestException as e:
-        handle_api_error(e, "Fetching Calls")
-        return []
+        handle_api_error(e, "Syncing Calls")
+
+@profiled("store")
+def get_call_frame():
+    """Typed frame of every stored call, rebuilt only when the store changed."""
+    store = get_call_store()
+    cache = get_api_cache()
+    version = store.version
+    frame = cache.peek("call-frame", version)
+    if frame is None:
+        frame = calls_frame_from_records(store.frame_records())
+        cache.invalidate("call-frame")
+        cache.set("call-frame", version, frame)
+    return frame
+
+@profiled("store")
+def load_calls(assistant_id=None, limit=100, force_sync=False):
+    """Reads recent calls from the local store after a delta sync."""
+    for _ in sync_calls(force=force_sync):
+        pass
+    return get_call_store().calls(assistant_id, limit)
+
+def _fetch_call_details(client, cache, call_id, store=None):
+    """Returns cached call details, refetching in-progress calls after a short TTL. Raises on request errors.
+
+    Freshly fetched details are indexed into ``store``'s transcript search when given.
+    """
+    entry = cache.entry("call-details", call_id)
+    if entry is not None and (entry[1].get('status') == 'ended' or time.time() - entry[0] < CALL_DETAILS_ACTIVE_TTL):
+        cache.record_lookup("call-details", True)
+        return entry[1]
+    
+    cache.record_lookup("call-details", False)
+    details = client.get(f"/call/{call_id}").json()
+    cache.set("call-details", call_id, details)
+    if store is not None:
+        store.index_transcripts([details])
+    return details
+
+class CallDetailPrefetcher:
+    """Warms the call-details cache on a small background pool.
+
+    Ids that are already cached or queued are skipped, so reruns of the same
+    page do not pile up duplicate requests. Failures are dropped silently;
+    the explicit fetch on click reports them.
+    """
+
+    def __init__(self, max_workers=PREFETCH_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="call-prefetch")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def prefetch(self, client, cache, call_ids, store=None):
+        for call_id in call_ids:
+            if cache.peek("call-details", call_id) is not None:
+                continue
+            with self._lock:
+                if call_id in self._pending:
+                    continue
+                self._pending.add(call_id)
+            self._pool.submit(self._fetch, client, cache, call_id, store)
+
+    def _fetch(self, client, cache, call_id, store):
+        try:
+            _fetch_call_details(client, cache, call_id, store)
+        except requests.exceptions.RequestException:
+            pass
+        finally:
+            with self._lock:
+                self._pending.discard(call_id)
+
+@st.cache_resource(show_spinner=False)
+def get_call_prefetcher():
+    return CallDetailPrefetcher()
+
+def prefetch_call_details(call_ids):
+    """Starts background fetches for call details not yet cached."""
+    client = get_vapi_client()
+    if client:
+        get_call_prefetcher().prefetch(client, get_api_cache(), call_ids, get_call_store())
+
+def get_transcript(call):
+    """Returns a call's transcript from either the top level or its artifact."""
+    return call.get('transcript') or (call.get('artifact') or {}).get('transcript') or ''
 
 def get_call_details(call_id):
-    """Fetches details for a specific call."""
-    headers = get_headers()
-    if not headers:
+    """Fetches details for a specific call, served from the prefetch cache when warm."""
+    client = get_vapi_client()
+    if not client:
         return None
     
-    url = f"{VAPI_BASE_URL}/call/{call_id}"
     try:
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        return _fetch_call_details(client, get_api_cache(), call_id, get_call_store())
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Fetching Call Details")
         return None
 
+# --- Call Export ---
+EXPORT_DIR = os.path.join(VAPI_CACHE_DIR, "exports")
+EXPORT_FORMATS = {"jsonl": ".jsonl.gz", "parquet": ".parquet"}
+EXPORT_DETAIL_WORKERS = 8
+EXPORT_ROWS_PER_PART = 50000
+# Options an export is started with; a resumed export reuses the checkpoint's
+EXPORT_OPTIONS = ('format', 'since', 'until', 'assistant_id', 'details')
+
+class JsonlGzipSink:
+    """Writes each page as its own gzip member.
+
+    Concatenated members are a valid ``.jsonl.gz`` after every page, so a
+    resume only has to truncate back to the last committed offset.
+    """
+
+    def __init__(self, path, state):
+        self._offset = state.get("offset", 0)
+        self._file = open(path, "r+b" if self._offset else "wb")
+        self._file.seek(self._offset)
+        self._file.truncate()
+
+    def write(self, calls):
+        """Appends a page; returns the new committed state."""
+        lines = "".join(json.dumps(call, separators=(",", ":")) + "\n" for call in calls)
+        self._file.write(gzip.compress(lines.encode()))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._offset = self._file.tell()
+        return {"offset": self._offset}
+
+    def close(self):
+        self._file.close()
+        return {"offset": self._offset}
+
+class ParquetSink:
+    """Writes pages as row groups of ``part-NNNNN.parquet`` files in the ``path`` directory.
+
+    A Parquet file is only readable once its footer is written, so parts are
+    written under a ``.tmp`` name and renamed when closed, every
+    ``EXPORT_ROWS_PER_PART`` rows. Columns are the call-frame fields, the
+    transcript, and the full call as JSON, so every part shares one schema.
+    """
+
+    def __init__(self, path, state):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa, self._pq = pa, pq
+        types = {
+            "createdAt": pa.timestamp("ms", tz="UTC"),
+            "startedAt": pa.timestamp("ms", tz="UTC"),
+            "endedAt": pa.timestamp("ms", tz="UTC"),
+            "duration": pa.float64(),
+            "cost": pa.float64(),
+        }
+        self._schema = pa.schema([(field, types.get(field, pa.string())) for field in CALL_FRAME_FIELDS]
+                                 + [("transcript", pa.string()), ("record", pa.string())])
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(path, name))
+        self._parts = state.get("parts", 0)
+        self._writer = None
+        self._rows = 0
+
+    def _part_path(self):
+        return os.path.join(self.path, f"part-{self._parts:05d}.parquet")
+
+    def write(self, calls):
+        """Appends a page as a row group; returns the committed state when a part was closed, else None."""
+        frame = pd.DataFrame.from_records(calls, columns=CALL_FRAME_FIELDS)
+        for column in ("createdAt", "startedAt", "endedAt"):
+            frame[column] = pd.to_datetime(frame[column], utc=True, format="ISO8601", errors="coerce")
+        for column in ("duration", "cost"):
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        frame["transcript"] = [get_transcript(call) for call in calls]
+        frame["record"] = [json.dumps(call, separators=(",", ":")) for call in calls]
+        table = self._pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+        
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._part_path() + ".tmp", self._schema, compression="zstd")
+        self._writer.write_table(table)
+        self._rows += len(calls)
+        if self._rows >= EXPORT_ROWS_PER_PART:
+            return self._commit()
+        return None
+
+    def _commit(self):
+        self._writer.close()
+        os.replace(self._part_path() + ".tmp", self._part_path())
+        self._parts += 1
+        self._writer = None
+        self._rows = 0
+        return {"parts": self._parts}
+
+    def close(self):
+        if self._writer is not None:
+            return self._commit()
+        return {"parts": self._parts}
+
+EXPORT_SINKS = {"jsonl": JsonlGzipSink, "parquet": ParquetSink}
+
+def export_path(fmt, assistant_id=None, days=None):
+    """Default export location under ``EXPORT_DIR``; stable per filter, so a page rerun can find the checkpoint."""
+    scope = assistant_id or "all"
+    window = f"-{days:g}d" if days else ""
+    return os.path.join(EXPORT_DIR, f"calls-{scope}{window}{EXPORT_FORMATS[fmt]}")
+
+def read_export_checkpoint(path):
+    """The checkpoint an export to ``path`` left behind, or None."""
+    try:
+        with open(path + ".checkpoint.json") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _write_export_checkpoint(path, checkpoint):
+    temporary = path + ".checkpoint.json.tmp"
+    with open(temporary, "w") as f:
+        json.dump(checkpoint, f, indent=1)
+    os.replace(temporary, path + ".checkpoint.json")
+
+def export_calls(client, path, fmt="jsonl", since=None, until=None, assistant_id=None, details=True,
+                 resume=False, on_page=None):
+    """Streams calls newest-first into ``path``, one page in memory at a time. Raises on request errors.
+
+    After each durable write a ``<path>.checkpoint.json`` records the oldest
+    exported ``createdAt`` and the ids exported at it. With ``resume=True`` an
+    unfinished export continues from there with the options it was started
+    with; otherwise ``path`` is overwritten. ``on_page(checkpoint)`` is called
+    after every page. Returns the final checkpoint.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    checkpoint = read_export_checkpoint(path) if resume else None
+    if checkpoint and checkpoint['complete']:
+        return checkpoint
+    if checkpoint is None:
+        checkpoint = {
+            "format": fmt, "since": _to_iso(since), "until": _to_iso(until), "assistant_id": assistant_id,
+            "details": details, "rows": 0, "created_at": None, "boundary_ids": [], "sink": {}, "complete": False,
+        }
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        if os.path.exists(path + ".checkpoint.json"):
+            os.remove(path + ".checkpoint.json")
+    
+    sink = EXPORT_SINKS[checkpoint['format']](path, checkpoint['sink'])
+    exported_ids = set(checkpoint['boundary_ids'])
+    # With details every call is its own request; smaller pages keep checkpoints frequent
+    page_size = CALL_PAGE_SIZE if checkpoint['details'] else MAX_CALL_PAGE_SIZE
+    pages = _iter_call_pages(client, checkpoint['assistant_id'], checkpoint['since'],
+                             checkpoint['created_at'] or checkpoint['until'], page_size=page_size)
+    committed = dict(checkpoint)
+    try:
+        with ThreadPoolExecutor(max_workers=EXPORT_DETAIL_WORKERS) as pool:
+            for page in pages:
+                page = [call for call in page if call['id'] not in exported_ids]
+                if not page:
+                    continue
+                if checkpoint['details']:
+                    page = list(pool.map(lambda call: client.get(f"/call/{call['id']}").json(), page))
+                state = sink.write(page)
+                
+                oldest = min(call['createdAt'] for call in page)
+                at_oldest = {call['id'] for call in page if call['createdAt'] == oldest}
+                if oldest == checkpoint['created_at']:
+                    at_oldest |= set(checkpoint['boundary_ids'])
+                checkpoint.update(rows=checkpoint['rows'] + len(page), created_at=oldest, boundary_ids=sorted(at_oldest))
+                if state is not None:
+                    committed = dict(checkpoint, sink=state)
+                    _write_export_checkpoint(path, committed)
+                if on_page:
+                    on_page(checkpoint)
+        checkpoint['complete'] = True
+    finally:
+        # Closing commits every fully written page, so an interrupted export keeps them
+        committed = dict(checkpoint, sink=sink.close())
+        _write_export_checkpoint(path, committed)
+    return committed
+
+# --- Config History ---
+CONFIG_HISTORY_PATH = os.path.join(VAPI_CACHE_DIR, "config_history.sqlite3")
+# Changes on every save without changing content; kept as revision metadata instead
+CONFIG_VOLATILE_FIELDS = ('updatedAt',)
+HISTORY_CHUNK_MIN = 1024
+HISTORY_CHUNK_MAX = 16384
+HISTORY_CHUNK_MASK = 7
+# Chunk boundaries may fall after a newline (real or JSON-escaped) or a sentence
+_HISTORY_PIECE_PATTERN = re.compile(r"(?<=\n)|(?<=\\n)|(?<=\. )")
+
+def _canonical_config(config):
+    content = {key: value for key, value in config.items() if key not in CONFIG_VOLATILE_FIELDS}
+    return json.dumps(content, sort_keys=True, indent=1, ensure_ascii=False)
+
+def _content_chunks(text):
+    """Splits text into content-defined chunks, so an edit only changes the chunks around it.
+
+    A chunk ends at a piece whose CRC matches ``HISTORY_CHUNK_MASK`` once it is
+    at least ``HISTORY_CHUNK_MIN`` long. Boundaries depend on content, not
+    offsets, so they realign right after an insertion or deletion.
+    """
+    chunks = []
+    current = []
+    size = 0
+    for piece in _HISTORY_PIECE_PATTERN.split(text):
+        current.append(piece)
+        size += len(piece)
+        if size >= HISTORY_CHUNK_MAX or (size >= HISTORY_CHUNK_MIN
+                                         and zlib.crc32(piece.encode()) & HISTORY_CHUNK_MASK == 0):
+            chunks.append("".join(current))
+            current = []
+            size = 0
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+def _digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+class ConfigHistory:
+    """Content-addressed local history of assistant configs.
+
+    A revision points at a document, the SHA-256 of the config's canonical
+    JSON. A document is a list of content-defined chunks, each stored once,
+    zlib-compressed. Re-recording an unchanged config adds nothing, and an
+    edit to a long prompt only stores the chunks around the edit.
+    """
+
+    def __init__(self, path=CONFIG_HISTORY_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id INTEGER PRIMARY KEY,
+                    hash TEXT UNIQUE NOT NULL,
+                    data BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS documents (
+                    hash TEXT PRIMARY KEY,
+                    chunks BLOB NOT NULL,
+                    size INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS revisions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    assistant_id TEXT NOT NULL,
+                    document TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    recorded_at TEXT NOT NULL,
+                    updated_at TEXT,
+                    name TEXT
+                );
+                CREATE INDEX IF NOT EXISTS revisions_by_assistant ON revisions (assistant_id, id);
+            """)
+
+    def _latest(self, assistant_id):
+        return self._conn.execute(
+            "SELECT document, updated_at FROM revisions WHERE assistant_id = ? ORDER BY id DESC LIMIT 1",
+            (assistant_id,)
+        ).fetchone()
+
+    def record(self, config, source):
+        """Snapshots ``config``; returns the new revision id, or None if it matches the latest one."""
+        assistant_id = config.get('id')
+        if not assistant_id:
+            return None
+        with self._lock:
+            latest = self._latest(assistant_id)
+        if latest and config.get('updatedAt') and latest[1] == config.get('updatedAt'):
+            return None
+
+        text = _canonical_config(config)
+        document = _digest(text)
+        with self._lock, self._conn:
+            latest = self._latest(assistant_id)
+            if latest and latest[0] == document:
+                return None
+            if not self._conn.execute("SELECT 1 FROM documents WHERE hash = ?", (document,)).fetchone():
+                chunk_hashes = []
+                chunks = {}
+                for chunk in _content_chunks(text):
+                    chunk_hashes.append(_digest(chunk))
+                    chunks[chunk_hashes[-1]] = chunk
+                placeholders = ", ".join("?" * len(chunks))
+                chunk_ids = dict(self._conn.execute(
+                    f"SELECT hash, id FROM chunks WHERE hash IN ({placeholders})", list(chunks)
+                ).fetchall())
+                for chunk_hash, chunk in chunks.items():
+                    if chunk_hash not in chunk_ids:
+                        chunk_ids[chunk_hash] = self._conn.execute(
+                            "INSERT INTO chunks (hash, data) VALUES (?, ?)", (chunk_hash, zlib.compress(chunk.encode()))
+                        ).lastrowid
+                # Chunk ids, not hashes: a large prompt's chunk list stays a few hundred bytes
+                self._conn.execute("INSERT INTO documents VALUES (?, ?, ?)", (
+                    document, zlib.compress(json.dumps([chunk_ids[chunk_hash] for chunk_hash in chunk_hashes]).encode()),
+                    len(text.encode())
+                ))
+            return self._conn.execute(
+                "INSERT INTO revisions (assistant_id, document, source, recorded_at, updated_at, name) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (assistant_id, document, source, datetime.now().astimezone().isoformat(timespec="seconds"),
+                 config.get('updatedAt'), config.get('name'))
+            ).lastrowid
+
+    def revisions(self, assistant_id):
+        """Recorded revisions of one assistant, newest first."""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT revisions.id, document, source, recorded_at, updated_at, name, size
+                FROM revisions JOIN documents ON documents.hash = revisions.document
+                WHERE assistant_id = ? ORDER BY revisions.id DESC
+            """, (assistant_id,)).fetchall()
+        columns = ["id", "document", "source", "recorded_at", "updated_at", "name", "size"]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def load(self, revision_id):
+        """Rebuilds a recorded config (without ``CONFIG_VOLATILE_FIELDS``), or None if unknown."""
+        with self._lock:
+            row = self._conn.execute("""
+                SELECT chunks FROM revisions JOIN documents ON documents.hash = revisions.document
+                WHERE revisions.id = ?
+            """, (revision_id,)).fetchone()
+            if row is None:
+                return None
+            chunk_ids = json.loads(zlib.decompress(row[0]))
+            placeholders = ", ".join("?" * len(set(chunk_ids)))
+            blobs = dict(self._conn.execute(
+                f"SELECT id, data FROM chunks WHERE id IN ({placeholders})", list(set(chunk_ids))
+            ).fetchall())
+        return json.loads("".join(zlib.decompress(blobs[chunk_id]).decode() for chunk_id in chunk_ids))
+
+    def stats(self):
+        """Revision count plus logical (uncompressed, per revision) and stored bytes."""
+        with self._lock:
+            revisions, logical = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM revisions JOIN documents ON documents.hash = revisions.document"
+            ).fetchone()
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            chunks, stored = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM chunks").fetchone()
+        return {"revisions": revisions, "documents": documents, "chunks": chunks,
+                "logical_bytes": logical, "stored_bytes": stored}
+
+@st.cache_resource(show_spinner=False)
+def get_config_history():
+    """Process-wide local config history."""
+    return ConfigHistory()
+
+def record_config_revision(config, source):
+    """Records a config revision, best effort: loading and saving assistants never depend on the history."""
+    try:
+        get_config_history().record(config, source)
+    except sqlite3.Error as e:
+        logger.warning("Could not record %s config of assistant %s in the history: %s", source, config.get('id'), e)
+
+def rollback_payload(current, target):
+    """Merge patch that restores ``target``'s content over ``current``, leaving server-managed fields alone."""
+    def content(config):
+        return {key: value for key, value in config.items() if key not in CONFIG_SYSTEM_FIELDS}
+    return merge_patch(content(current), content(target))
+
 # --- Phone Number Management ---
 def list_phone_numbers():
     """Fetches all phone numbers."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return []
     
-    url = f"{VAPI_BASE_URL}/phone-number"
     try:
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        return get_listing_refresher().get("phone-numbers", None, lambda: client.get("/phone-number").json())
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Fetching Phone Numbers")
         return []
 
 def update_phone_number(phone_id, payload):
     """Updates phone number configuration."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return False
     
-    url = f"{VAPI_BASE_URL}/phone-number/{phone_id}"
     try:
-        response = requests.patch(
-            url,
-            headers=headers,
-            data=json.dumps(payload),
-            timeout=REQUEST_TIMEOUT
-        )
-        response.raise_for_status()
+        updated = client.patch(f"/phone-number/{phone_id}", payload, retry=True).json()
+        get_api_cache().update("phone-numbers", lambda numbers: _replace_by_id(numbers, updated))
         return True
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Updating Phone Number")
@@ -250,35 +2292,26 @@ def update_phone_number(phone_id, payload):
 # --- Squad Management ---
 def list_squads():
     """Fetches all squads."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return []
     
-    url = f"{VAPI_BASE_URL}/squad"
     try:
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        return get_listing_refresher().get("squads", None, lambda: client.get("/squad").json())
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Fetching Squads")
         return []
 
 def create_squad(payload):
     """Creates a new squad."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return None
     
-    url = f"{VAPI_BASE_URL}/squad"
     try:
-        response = requests.post(
-            url,
-            headers=headers,
-            data=json.dumps(payload),
-            timeout=REQUEST_TIMEOUT
-        )
-        response.raise_for_status()
-        return response.json()
+        created = client.post("/squad", payload).json()
+        get_api_cache().invalidate("squads")
+        return created
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Creating Squad")
         return None
@@ -286,35 +2319,26 @@ def create_squad(payload):
 # --- Tool/Function Management ---
 def list_tools():
     """Fetches all custom tools."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return []
     
-    url = f"{VAPI_BASE_URL}/tool"
     try:
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        return get_listing_refresher().get("tools", None, lambda: client.get("/tool").json())
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Fetching Tools")
         return []
 
 def create_tool(payload):
     """Creates a new tool."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return None
     
-    url = f"{VAPI_BASE_URL}/tool"
     try:
-        response = requests.post(
-            url,
-            headers=headers,
-            data=json.dumps(payload),
-            timeout=REQUEST_TIMEOUT
-        )
-        response.raise_for_status()
-        return response.json()
+        created = client.post("/tool", payload).json()
+        get_api_cache().invalidate("tools")
+        return created
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Creating Tool")
         return None
@@ -322,34 +2346,160 @@ def create_tool(payload):
 # --- Analytics & Logs ---
 def get_analytics_summary():
     """Gets analytics summary."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return None
     
-    url = f"{VAPI_BASE_URL}/analytics"
     try:
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        return client.get("/analytics").json()
     except requests.exceptions.RequestException:
         return None
 
 def list_logs(limit=100):
     """Fetches system logs."""
-    headers = get_headers()
-    if not headers:
+    client = get_vapi_client()
+    if not client:
         return []
     
-    url = f"{VAPI_BASE_URL}/log"
-    params = {"limit": limit}
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        return get_listing_refresher().get("logs", limit, lambda: client.get("/log", params={"limit": limit}).json())
     except requests.exceptions.RequestException:
         return []
 
+# --- Call Analytics ---
+CALL_FRAME_FIELDS = ['id', 'assistantId', 'status', 'endedReason', 'customerNumber', 'phoneNumber',
+                     'createdAt', 'startedAt', 'endedAt', 'duration', 'cost']
+DURATION_PERCENTILES = [0.5, 0.9, 0.95, 0.99]
+
+@profiled("data")
+def calls_to_frame(calls):
+    """Loads raw call dicts into a typed DataFrame, one row per call.
+
+    Timestamps are parsed in one vectorized pass, ``duration`` falls back to
+    ``endedAt - startedAt`` when the API omits it, and low-cardinality columns
+    are categorical so group-bys stay cheap at millions of rows.
+    """
+    return calls_frame_from_records(calls)
+
+def calls_frame_from_records(records):
+    """Builds the typed call frame from dicts or ``CALL_FRAME_FIELDS``-ordered tuples."""
+    raw = pd.DataFrame.from_records(records, columns=CALL_FRAME_FIELDS)
+    
+    def timestamps(column):
+        return pd.to_datetime(raw[column], utc=True, format="ISO8601", errors="coerce")
+    
+    duration = pd.to_numeric(raw['duration'], errors="coerce")
+    if duration.isna().any():
+        duration = duration.fillna((timestamps('endedAt') - timestamps('startedAt')).dt.total_seconds())
+    return pd.DataFrame({
+        "id": raw['id'].astype("string"),
+        "assistant_id": raw['assistantId'].astype("category"),
+        "status": raw['status'].astype("category"),
+        "ended_reason": raw['endedReason'].astype("category"),
+        "customer_number": raw['customerNumber'],
+        "phone_number": raw['phoneNumber'],
+        "created_at": timestamps('createdAt'),
+        "duration": duration.round().astype("Int64"),
+        "cost": pd.to_numeric(raw['cost'], errors="coerce").fillna(0.0),
+    })
+
+@profiled("data")
+def summarize_calls(frame):
+    """Computes dashboard aggregates from a frame built by ``calls_to_frame``."""
+    durations = frame['duration'].dropna().to_numpy(dtype="int64")
+    has_durations = len(durations) > 0
+    by_assistant = frame.groupby('assistant_id', observed=True).agg(
+        calls=('id', 'size'),
+        total_duration=('duration', 'sum'),
+        avg_duration=('duration', 'mean'),
+        cost=('cost', 'sum'),
+    ).sort_values('calls', ascending=False)
+    
+    return {
+        "count": len(frame),
+        "with_duration": len(durations),
+        "avg_duration": int(durations.sum() // len(durations)) if has_durations else 0,
+        "total_duration": int(durations.sum()),
+        "max_duration": int(durations.max()) if has_durations else 0,
+        "percentiles": dict(zip(DURATION_PERCENTILES, np.percentile(durations, [p * 100 for p in DURATION_PERCENTILES])))
+        if has_durations else {},
+        "total_cost": float(frame['cost'].sum()),
+        "status_counts": frame['status'].value_counts(),
+        "ended_reason_counts": frame['ended_reason'].value_counts(),
+        "by_assistant": by_assistant,
+        "by_hour": frame.groupby(frame['created_at'].dt.floor('h')).size(),
+    }
+
+CALL_STATUSES = ['queued', 'ringing', 'in-progress', 'forwarding', 'ended']
+CALL_SORT_COLUMNS = {"Date": "created_at", "Duration": "duration", "Cost": "cost", "Status": "status"}
+
+@profiled("data")
+def filter_call_frame(frame, assistant_id=None, statuses=None, date_range=None, phone=None,
+                      min_duration=0, max_duration=None):
+    """Applies the call log filters as one vectorized boolean mask."""
+    mask = np.ones(len(frame), dtype=bool)
+    if assistant_id:
+        mask &= (frame['assistant_id'] == assistant_id).to_numpy()
+    if statuses:
+        mask &= frame['status'].isin(statuses).to_numpy()
+    if date_range:
+        start = pd.Timestamp(date_range[0], tz="UTC")
+        end = pd.Timestamp(date_range[-1], tz="UTC") + pd.Timedelta(days=1)
+        mask &= ((frame['created_at'] >= start) & (frame['created_at'] < end)).to_numpy()
+    if phone:
+        matches = [frame[column].astype("string").str.contains(phone, regex=False, na=False)
+                   for column in ('customer_number', 'phone_number')]
+        mask &= (matches[0] | matches[1]).to_numpy()
+    duration = frame['duration'].fillna(0)
+    if min_duration:
+        mask &= (duration >= min_duration).to_numpy()
+    if max_duration is not None:
+        mask &= (duration <= max_duration).to_numpy()
+    return frame[mask]
+
+@profiled("data")
+def format_call_log_table(frame):
+    """Display columns for the call log; only call this on the rows being shown."""
+    duration = frame['duration']
+    return pd.DataFrame({
+        "ID": short_ids(frame),
+        "Duration": ((duration // 60).astype("string") + "m " + (duration % 60).astype("string") + "s")
+        .where(duration.fillna(0) > 0, "N/A"),
+        "From": frame['customer_number'].fillna('N/A'),
+        "To": frame['phone_number'].fillna('N/A'),
+        "Status": frame['status'].astype("string").fillna('N/A'),
+        "Cost": frame['cost'],
+        "Date": format_call_dates(frame),
+    })
+
+def format_call_dates(frame):
+    return frame['created_at'].dt.strftime('%Y-%m-%d %H:%M').fillna('N/A')
+
+def short_ids(frame):
+    return frame['id'].fillna('N/A').str[:12] + '...'
+
 # --- Helper Functions ---
+def fetch_concurrently(fetches, max_workers=None):
+    """Runs independent fetches in parallel.
+
+    Yields ``(key, result, seconds)`` tuples in completion order. Worker threads
+    are attached to the current script run so helpers can still report errors
+    on the page.
+    """
+    ctx = get_script_run_ctx()
+    
+    def timed(fetch):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        start = time.perf_counter()
+        result = fetch()
+        return result, time.perf_counter() - start
+    
+    with ThreadPoolExecutor(max_workers=max_workers or len(fetches)) as pool:
+        futures = {pool.submit(timed, fetch): key for key, fetch in fetches.items()}
+        for future in as_completed(futures):
+            result, elapsed = future.result()
+            yield futures[future], result, elapsed
+
 def get_system_prompt(config):
     """Extracts system prompt from config."""
     if config and 'model' in config and 'messages' in config['model']:
@@ -358,86 +2508,302 @@ def get_system_prompt(config):
                 return message.get('content', '')
     return ""
 
+def system_prompt_messages(messages, new_prompt):
+    """Returns a copy of ``messages`` with the system prompt replaced, or prepended if missing.
+
+    Only the list and the system message are copied; other messages are shared.
+    """
+    for index, message in enumerate(messages):
+        if message.get('role') == 'system':
+            return messages[:index] + [{**message, 'content': new_prompt}] + messages[index + 1:]
+    return [{"role": "system", "content": new_prompt}] + list(messages) if new_prompt else list(messages)
+
 def set_system_prompt(config, new_prompt):
     """Updates system prompt in config."""
-    if 'model' not in config:
-        config['model'] = {}
-    if 'messages' not in config['model']:
-        config['model']['messages'] = []
-    
-    found = False
-    for message in config['model']['messages']:
-        if message.get('role') == 'system':
-            message['content'] = new_prompt
-            found = True
-            break
-    
-    if not found and new_prompt:
-        config['model']['messages'].insert(0, {"role": "system", "content": new_prompt})
+    model = config.setdefault('model', {})
+    model['messages'] = system_prompt_messages(model.get('messages', []), new_prompt)
+
+def get_editor_values(config, default_name=''):
+    """Returns the editable fields of a config, with the editor's defaults filled in.
+
+    The shape mirrors a PATCH payload, plus a top-level ``systemPrompt``.
+    """
+    model_config = config.get('model', {})
+    voice_config = config.get('voice', {})
+    transcriber_config = config.get('transcriber', {})
+    return {
+        "name": config.get('name', default_name),
+        "firstMessage": config.get('firstMessage', ''),
+        "backgroundSound": config.get('backgroundSound', 'office'),
+        "backgroundDenoisingEnabled": config.get('backgroundDenoisingEnabled', False),
+        "endCallPhrases": config.get('endCallPhrases', []),
+        "silenceTimeoutSeconds": config.get('silenceTimeoutSeconds', 10),
+        "maxDurationSeconds": config.get('maxDurationSeconds', 600),
+        "recordingEnabled": config.get('recordingEnabled', False),
+        "hipaaEnabled": config.get('hipaaEnabled', False),
+        "serverUrl": config.get('serverUrl', ''),
+        "serverSecret": config.get('serverSecret', ''),
+        "systemPrompt": get_system_prompt(config),
+        "model": {
+            "model": model_config.get('model', 'gpt-4o'),
+            "temperature": model_config.get('temperature', 0.7),
+            # <CHANGE> Fixed max tokens - use min of current value and 4000 to avoid error
+            "maxTokens": min(model_config.get('maxTokens', 2000), 4000),
+        },
+        "voice": {
+            "provider": voice_config.get('provider', 'playht'),
+            "voiceId": voice_config.get('voiceId', 'andrew'),
+            "speed": voice_config.get('speed', 1.0),
+        },
+        "transcriber": {
+            "provider": transcriber_config.get('provider', 'deepgram'),
+            "model": transcriber_config.get('model', 'base'),
+            "language": transcriber_config.get('language', 'en'),
+        },
+    }
+
+def build_assistant_payload(config, edits, current=None):
+    """Builds the PATCH payload for the fields in ``edits`` that differ from ``config``.
+
+    ``edits`` uses the ``get_editor_values`` shape and may be partial, e.g. only
+    a new system prompt for a bulk change. The result is a JSON merge patch in
+    which nested sections only carry the keys that changed; the config itself
+    is never copied.
+    """
+    if current is None:
+        current = get_editor_values(config)
+    
+    payload = minimize_patch(current, {field: value for field, value in edits.items() if field != "systemPrompt"})
+    
+    if "systemPrompt" in edits:
+        messages = config.get('model', {}).get('messages', [])
+        new_messages = system_prompt_messages(messages, edits["systemPrompt"])
+        if new_messages != messages:
+            payload.setdefault('model', {})['messages'] = new_messages
+    
+    return payload
+
+def describe_config_value(value, max_length=120):
+    """Short one-line rendering of a config value for change tables."""
+    if value is MISSING:
+        return "—"
+    text = value if isinstance(value, str) else json.dumps(value)
+    return text if len(text) <= max_length else text[:max_length - 1] + "…"
+
+# Known agents, shown alongside live assistants in case the listing misses them
+AI_AGENTS = {
+    "Agent CEO": {"id": "bf161516-6d88-490c-972e-274098a6b51a"},
+    "Agent Social": {"id": "bf161516-6d88-490c-972e-274098a6b51a"},
+    "Agent Mindset": {"id": "4fe7083e-2f28-4502-b6bf-4ae6ea71a8f4"},
+    "Agent Blogger": {"id": "f8ef1ad5-5281-42f1-ae69-f94ff7acb453"},
+    "Agent Grant": {"id": "7673e69d-170b-4319-bdf4-e74e5370e98a"},
+    "Agent Prayer AI": {"id": "339cdad6-9989-4bb6-98ed-bd15521707d1"},
+    "Agent Metrics": {"id": "4820eab2-adaf-4f17-a8a0-30cab3e3f007"},
+    "Agent Researcher": {"id": "f05c182f-d3d1-4a17-9c79-52442a9171b8"},
+    "Agent Investor": {"id": "1008771d-86ca-472a-a125-7a7e10100297"},
+    "Agent Newsroom": {"id": "76f1d6e5-cab4-45b8-9aeb-d3e6f3c0c019"},
+    "STREAMLIT Agent": {"id": "538258da-0dda-473d-8ef8-5427251f3ad5"},
+    "HTML/CSS Agent": {"id": "14b94e2f-299b-4e75-a445-a4f5feacc522"},
+    "Business Plan Agent": {"id": "bea627a6-3aaf-45d0-8753-94f98d80972c"},
+    "Ecom Agent": {"id": "04b80e02-9615-4c06-9424-93b4b1e2cdc9"},
+    "Agent Health": {"id": "7b2b8b86-5caa-4f28-8c6b-e7d3d0404f06"},
+    "Cinch Closer": {"id": "232f3d9c-18b3-4963-bdd9-e7de3be156ae"},
+    "DISC Agent": {"id": "41fe59e1-829f-4936-8ee5-eef2bb1287fe"},
+    "Agent Clone": {"id": "88862739-c227-4bfc-b90a-5f450a823e23"},
+    "Agent Doctor": {"id": "9d1cccc6-3193-4694-a9f7-853198ee4082"},
+    "Agent Multi-Lig": {"id": "8f045bce-08bc-4477-8d3d-05f233a44df3"},
+    "Agent Real Estate": {"id": "d982667e-d931-477c-9708-c183ba0aa964"},
+    "Business Launcher": {"id": "dffb2e5c-7d59-462b-a8aa-48746ea70cb1"},
+    "Agent Booking": {"id": "6de56812-68b9-4b13-8a5c-69f45e642af2"}
+}
+
+class AgentRegistry:
+    """Live and hardcoded agents merged once, with dict lookups by label and id.
+
+    ``agents`` maps display labels to ``{"id", "live"}`` entries (the shape
+    ``get_agent_list`` has always returned), ``ids`` maps labels to ids,
+    ``by_id`` maps ids to their first label and ``labels`` is pre-sorted for
+    select boxes.
+    """
+
+    def __init__(self, live_agents, hardcoded_agents=AI_AGENTS):
+        self.agents = {}
+        self.by_id = {}
+        
+        for agent_id, name in live_agents:
+            self._add(f"{name} (Live)", agent_id, live=True)
+        
+        live_ids = set(self.by_id)
+        for name, details in hardcoded_agents.items():
+            if details['id'] not in live_ids:
+                self._add(f"{name} (Hardcoded)", details['id'], live=False)
+        
+        self.ids = {label: details['id'] for label, details in self.agents.items()}
+        self.labels = sorted(self.agents)
+
+    def _add(self, label, agent_id, live):
+        self.agents[label] = {"id": agent_id, "live": live}
+        self.by_id.setdefault(agent_id, label)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _build_agent_registry(live_agents):
+    return AgentRegistry(live_agents)
+
+def get_agent_registry():
+    """Returns the agent registry for the current ``list_assistants`` result.
+
+    Registries are keyed by the (id, name) pairs of the listing, so a new one is
+    only built when the cached listing itself changes.
+    """
+    live_agents = tuple((agent['id'], agent.get('name', 'Unnamed Agent')) for agent in list_assistants())
+    return _build_agent_registry(live_agents)
 
 def get_agent_list():
     """Gets combined hardcoded and live agent list."""
-    AI_AGENTS = {
-        "Agent CEO": {"id": "bf161516-6d88-490c-972e-274098a6b51a"},
-        "Agent Social": {"id": "bf161516-6d88-490c-972e-274098a6b51a"},
-        "Agent Mindset": {"id": "4fe7083e-2f28-4502-b6bf-4ae6ea71a8f4"},
-        "Agent Blogger": {"id": "f8ef1ad5-5281-42f1-ae69-f94ff7acb453"},
-        "Agent Grant": {"id": "7673e69d-170b-4319-bdf4-e74e5370e98a"},
-        "Agent Prayer AI": {"id": "339cdad6-9989-4bb6-98ed-bd15521707d1"},
-        "Agent Metrics": {"id": "4820eab2-adaf-4f17-a8a0-30cab3e3f007"},
-        "Agent Researcher": {"id": "f05c182f-d3d1-4a17-9c79-52442a9171b8"},
-        "Agent Investor": {"id": "1008771d-86ca-472a-a125-7a7e10100297"},
-        "Agent Newsroom": {"id": "76f1d6e5-cab4-45b8-9aeb-d3e6f3c0c019"},
-        "STREAMLIT Agent": {"id": "538258da-0dda-473d-8ef8-5427251f3ad5"},
-        "HTML/CSS Agent": {"id": "14b94e2f-299b-4e75-a445-a4f5feacc522"},
-        "Business Plan Agent": {"id": "bea627a6-3aaf-45d0-8753-94f98d80972c"},
-        "Ecom Agent": {"id": "04b80e02-9615-4c06-9424-93b4b1e2cdc9"},
-        "Agent Health": {"id": "7b2b8b86-5caa-4f28-8c6b-e7d3d0404f06"},
-        "Cinch Closer": {"id": "232f3d9c-18b3-4963-bdd9-e7de3be156ae"},
-        "DISC Agent": {"id": "41fe59e1-829f-4936-8ee5-eef2bb1287fe"},
-        "Agent Clone": {"id": "88862739-c227-4bfc-b90a-5f450a823e23"},
-        "Agent Doctor": {"id": "9d1cccc6-3193-4694-a9f7-853198ee4082"},
-        "Agent Multi-Lig": {"id": "8f045bce-08bc-4477-8d3d-05f233a44df3"},
-        "Agent Real Estate": {"id": "d982667e-d931-477c-9708-c183ba0aa964"},
-        "Business Launcher": {"id": "dffb2e5c-7d59-462b-a8aa-48746ea70cb1"},
-        "Agent Booking": {"id": "6de56812-68b9-4b13-8a5c-69f45e642af2"}
-    }
-    
-    fetched_agents = list_assistants()
-    combined_agents = {}
-    
-    for agent in fetched_agents:
-        name = agent.get('name', 'Unnamed Agent')
-        combined_agents[f"{name} (Live)"] = {"id": agent['id'], "live": True}
+    return get_agent_registry().agents
+
+# --- Page Configuration ---
+def setup_page():
+    """Applies page config and custom CSS; must run before any other Streamlit call."""
+    st.set_page_config(
+        page_title="Vapi Agent Configuration Editor",
+        page_icon="🤖",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
     
-    for name, details in AI_AGENTS.items():
-        if details['id'] not in [a['id'] for a in fetched_agents]:
-            combined_agents[f"{name} (Hardcoded)"] = {"id": details['id'], "live": False}
+    # --- Custom CSS for Better Styling ---
+    st.markdown("""
+        <style>
+            .metric-card {
+                background-color: #f0f2f6;
+                padding: 20px;
+                border-radius: 10px;
+                margin: 10px 0;
+            }
+            .success-box {
+                background-color: #d4edda;
+                padding: 15px;
+                border-radius: 5px;
+                border-left: 4px solid #28a745;
+            }
+            .error-box {
+                background-color: #f8d7da;
+                padding: 15px;
+                border-radius: 5px;
+                border-left: 4px solid #dc3545;
+            }
+        </style>
+    """, unsafe_allow_html=True)
+
+def _merged_length(intervals):
+    """Total length covered by possibly overlapping ``(start, end)`` intervals."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+def render_rerun_profile(profiler):
+    """Per-rerun breakdown: category totals, a span waterfall and the optional cProfile report."""
+    import altair as alt
+    
+    total_ms = (time.perf_counter() - profiler.started) * 1000
+    spans = profiler.frame()
+    main_thread = threading.current_thread().name
+    pages = spans[spans["category"] == "page"]
+    
+    # Widget/render time is the page time not covered by API, store or data spans on the script thread
+    nested = spans[(spans["thread"] == main_thread) & ~spans["category"].isin(["page", "setup"])]
+    page_ms = pages["ms"].sum()
+    blocked_ms = sum(
+        _merged_length([(max(start, page.start), min(end, page.end)) for start, end in zip(nested["start"], nested["end"])
+                        if start < page.end and end > page.start]) * 1000
+        for page in pages.itertuples()
+    )
     
-    return combined_agents
+    st.divider()
+    st.subheader("⏱️ Rerun Profile")
+    by_category = spans.groupby("category")["ms"].agg(["count", "sum"])
+    columns = st.columns(5)
+    for column, (label, value) in zip(columns, [
+        ("Rerun", total_ms),
+        ("API (all threads)", by_category["sum"].get("api", 0.0)),
+        ("Store", by_category["sum"].get("store", 0.0)),
+        ("DataFrames", by_category["sum"].get("data", 0.0)),
+        ("Widgets & Rendering", page_ms - blocked_ms),
+    ]):
+        with column:
+            st.metric(label, f"{value:.0f}ms", delta=None)
+    st.caption(f"{int(by_category['count'].get('api', 0))} API calls; spans on worker threads overlap the script thread, "
+               "so category totals can exceed the rerun time.")
+    
+    waterfall = spans.head(PROFILE_MAX_SPANS).assign(
+        label=lambda frame: [f"{index:03d} {name}" for index, name in enumerate(frame["name"])],
+        start_ms=lambda frame: frame["start"] * 1000,
+        end_ms=lambda frame: frame["end"] * 1000,
+    )
+    chart = alt.Chart(waterfall).mark_bar().encode(
+        x=alt.X("start_ms:Q", title="ms since rerun start"),
+        x2="end_ms:Q",
+        y=alt.Y("label:N", sort=None, title=None),
+        color="category:N",
+        tooltip=["name", "category", "thread", alt.Tooltip("ms:Q", format=".1f")],
+    ).properties(height=max(120, 18 * len(waterfall)))
+    st.altair_chart(chart, use_container_width=True)
+    if len(spans) > PROFILE_MAX_SPANS:
+        st.caption(f"Showing the first {PROFILE_MAX_SPANS} of {len(spans)} spans.")
+    
+    report = profiler.cprofile_report()
+    if report:
+        with st.expander("cProfile (script thread, by cumulative time)"):
+            st.code(report)
 
 # --- Streamlit UI Functions ---
+@profiled("page")
 def dashboard_page():
     """Main dashboard with analytics."""
     st.header("📊 Dashboard")
     
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        agents = list_assistants()
-        st.metric("Total Assistants", len(agents), delta=None)
-    
-    with col2:
-        calls = list_calls(limit=1000)
-        st.metric("Recent Calls", len(calls), delta=None)
-    
-    with col3:
-        phone_nums = list_phone_numbers()
-        st.metric("Phone Numbers", len(phone_nums), delta=None)
+    metric_fetches = {
+        "assistants": ("Total Assistants", list_assistants),
+        "calls": ("Recent Calls", lambda: load_calls(limit=1000)),
+        "phone_numbers": ("Phone Numbers", list_phone_numbers),
+        "squads": ("Squads", list_squads),
+    }
     
-    with col4:
-        squads = list_squads()
-        st.metric("Squads", len(squads), delta=None)
+    # Placeholders let each metric render as soon as its own fetch returns
+    slots = {}
+    for column, (key, (label, _)) in zip(st.columns(4), metric_fetches.items()):
+        with column:
+            metric_slot = st.empty()
+            metric_slot.metric(label, "…", delta=None)
+            slots[key] = (metric_slot, st.empty())
+    
+    results = {}
+    timings = {}
+    started = time.perf_counter()
+    for key, result, elapsed in fetch_concurrently({key: fetch for key, (_, fetch) in metric_fetches.items()}):
+        results[key] = result
+        timings[key] = elapsed
+        metric_slot, timing_slot = slots[key]
+        metric_slot.metric(metric_fetches[key][0], len(result), delta=None)
+        timing_slot.caption(f"⏱️ {elapsed:.2f}s")
+    wall_time = time.perf_counter() - started
+    
+    slowest = max(timings, key=timings.get)
+    st.caption(
+        f"Fetched {len(timings)} sources in {wall_time:.2f}s "
+        f"(serial: {sum(timings.values()):.2f}s, slowest: {metric_fetches[slowest][0]})"
+    )
+    calls = results["calls"]
     
     st.divider()
     
@@ -445,36 +2811,163 @@ def dashboard_page():
     if calls:
         st.subheader("📈 Call Analytics")
         
+        frame = calls_to_frame(calls)
+        summary = summarize_calls(frame)
+        
         # Duration analysis
-        durations = [call.get('duration', 0) for call in calls if 'duration' in call]
-        if durations:
-            col1, col2, col3 = st.columns(3)
+        if summary["with_duration"]:
+            col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Avg Call Duration", f"{sum(durations)//len(durations)}s", delta=None)
+                st.metric("Avg Call Duration", f"{summary['avg_duration']}s", delta=None)
             with col2:
-                st.metric("Total Call Time", f"{sum(durations)//60}m", delta=None)
+                st.metric("Total Call Time", f"{summary['total_duration']//60}m", delta=None)
             with col3:
-                st.metric("Longest Call", f"{max(durations)}s", delta=None)
+                st.metric("Longest Call", f"{summary['max_duration']}s", delta=None)
+            with col4:
+                st.metric("Total Cost", f"${summary['total_cost']:.2f}", delta=None)
+            
+            percentile_cols = st.columns(len(summary["percentiles"]))
+            for column, (percentile, value) in zip(percentile_cols, summary["percentiles"].items()):
+                with column:
+                    st.metric(f"p{int(percentile * 100)} Duration", f"{int(value)}s", delta=None)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption("Calls per Hour")
+            st.line_chart(summary["by_hour"])
+        with col2:
+            st.caption("Calls by Status")
+            st.bar_chart(summary["status_counts"])
+        
+        st.caption("Calls by Assistant")
+        assistant_names = {agent['id']: agent.get('name', 'Unnamed Agent') for agent in results["assistants"]}
+        by_assistant = summary["by_assistant"].reset_index()
+        by_assistant.insert(0, "assistant", by_assistant['assistant_id'].map(assistant_names).fillna(by_assistant['assistant_id']))
+        st.dataframe(by_assistant.drop(columns='assistant_id'), use_container_width=True, hide_index=True)
         
         # Recent calls table
         st.subheader("Recent Calls")
-        recent_data = []
-        for call in calls[:20]:
-            recent_data.append({
-                "ID": call.get('id', 'N/A')[:12] + '...',
-                "Duration": f"{call.get('duration', 0)}s",
-                "Status": call.get('status', 'N/A'),
-                "From": call.get('customerNumber', 'N/A'),
-                "Date": datetime.fromisoformat(call.get('createdAt', '').replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M') if 'createdAt' in call else 'N/A'
-            })
-        st.dataframe(pd.DataFrame(recent_data), use_container_width=True)
+        recent = frame.head(20)
+        recent_data = pd.DataFrame({
+            "ID": short_ids(recent),
+            "Duration": recent['duration'].fillna(0).astype("string") + "s",
+            "Status": recent['status'].astype("string").fillna('N/A'),
+            "From": recent['customer_number'].fillna('N/A'),
+            "Date": format_call_dates(recent),
+        })
+        st.dataframe(recent_data, use_container_width=True)
+    
+    st.divider()
+    
+    # Trends read the rollup tables kept current by every sync, never raw calls
+    st.subheader("📉 Trends")
+    assistant_names = {agent['id']: agent.get('name', 'Unnamed Agent') for agent in results["assistants"]}
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        days = st.selectbox("Period", [7, 30, 90], index=1, format_func=lambda value: f"Last {value} days")
+    with col2:
+        granularity = st.radio("Granularity", ["day", "hour"], horizontal=True)
+    with col3:
+        trend_assistant = st.selectbox("Assistant", [None] + list(assistant_names),
+                                       format_func=lambda value: "All assistants" if value is None else assistant_names[value],
+                                       key="trend_assistant")
+    
+    started = time.perf_counter()
+    store = get_call_store()
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    trends = store.rollups(since, granularity, trend_assistant)
+    ended_reasons = store.ended_reason_totals(since, trend_assistant)
+    query_time = time.perf_counter() - started
+    if trends.empty:
+        st.info("No calls synced for this period yet.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.caption("Calls")
+            st.line_chart(trends["calls"])
+        with col2:
+            st.caption("p95 Duration (s)")
+            st.line_chart(trends["p95_duration"])
+        with col3:
+            st.caption("Cost ($)")
+            st.line_chart(trends["cost"])
+        if not ended_reasons.empty:
+            st.caption("Ended Reasons")
+            st.bar_chart(ended_reasons)
+    st.caption(f"⏱️ Read {len(trends)} {granularity} buckets from rollups in {query_time * 1000:.0f}ms")
+
+def render_config_history(assistant_id):
+    """Recorded revisions of one assistant, a diff between two of them and rollback."""
+    history = get_config_history()
+    revisions = history.revisions(assistant_id)
+    with st.expander(f"🕘 Version History ({len(revisions)} revisions)"):
+        if not revisions:
+            st.info("No revisions recorded yet. Loading or saving the configuration records one.")
+            return
+        
+        st.dataframe(pd.DataFrame([{
+            "Revision": f"#{revision['id']}",
+            "Recorded": revision['recorded_at'][:19].replace("T", " "),
+            "Source": revision['source'],
+            "Server Updated": revision['updated_at'],
+            "Name": revision['name'],
+            "Size": f"{revision['size'] / 1024:.1f} KB",
+            "Content": revision['document'][:12],
+        } for revision in revisions]), use_container_width=True, hide_index=True)
+        
+        labels = {revision['id']: f"#{revision['id']} · {revision['recorded_at'][:16].replace('T', ' ')} · {revision['source']}"
+                  for revision in revisions}
+        # Keyed on the newest revision, so a new save resets the comparison to the latest two
+        key = f"{assistant_id}_{revisions[0]['id']}"
+        col1, col2 = st.columns(2)
+        with col1:
+            base_id = st.selectbox("Revision", list(labels), index=min(1, len(revisions) - 1),
+                                   format_func=labels.get, key=f"history_base_{key}")
+        with col2:
+            target_id = st.selectbox("Compared with", list(labels), index=0,
+                                     format_func=labels.get, key=f"history_target_{key}")
+        
+        base, target = history.load(base_id), history.load(target_id)
+        changes = diff_paths(base, target)
+        if changes:
+            st.caption(f"{len(changes)} change(s) from #{base_id} to #{target_id}")
+            st.dataframe(pd.DataFrame([
+                {"Field": format_path(path), f"#{base_id}": describe_config_value(old), f"#{target_id}": describe_config_value(new)}
+                for path, old, new in changes
+            ]), use_container_width=True, hide_index=True)
+            base_prompt, target_prompt = get_system_prompt(base), get_system_prompt(target)
+            if base_prompt != target_prompt:
+                st.caption("System prompt")
+                st.code("\n".join(difflib.unified_diff(
+                    base_prompt.splitlines(), target_prompt.splitlines(),
+                    fromfile=f"#{base_id}", tofile=f"#{target_id}", lineterm=""
+                )), language="diff")
+        else:
+            st.caption(f"#{base_id} and #{target_id} have the same content.")
+        
+        if st.button(f"⏪ Roll back to #{base_id}", key=f"history_rollback_{key}"):
+            current = get_assistant_config(assistant_id)
+            if current:
+                payload = rollback_payload(current, base)
+                if not payload:
+                    st.info(f"ℹ️ The live configuration already matches #{base_id}.")
+                elif update_assistant_config(assistant_id, payload):
+                    st.session_state.current_config = None
+                    time.sleep(1)
+                    st.rerun()
+        
+        stats = history.stats()
+        st.caption(f"💾 {stats['revisions']} revisions of all assistants: {stats['logical_bytes'] / 1024:.0f} KB of configs "
+                   f"stored in {stats['stored_bytes'] / 1024:.0f} KB ({stats['chunks']} unique chunks)")
 
+@profiled("page")
 def assistant_editor_page():
     """Enhanced assistant editor."""
     st.header("✏️ Assistant Editor")
     
-    combined_agents = get_agent_list()
-    agent_names = sorted(list(combined_agents.keys()))
+    registry = get_agent_registry()
+    combined_agents = registry.agents
+    agent_names = registry.labels
     
     col1, col2 = st.columns([3, 1])
     
@@ -483,8 +2976,9 @@ def assistant_editor_page():
     
     with col2:
         if st.button("🔄 Refresh List", use_container_width=True):
-            st.cache_data.clear()
+            get_api_cache().invalidate("assistants")
             st.rerun()
+    render_listing_age("assistants", 100)
     
     if selected_agent_name:
         assistant_id = combined_agents[selected_agent_name]['id']
@@ -525,7 +3019,6 @@ def assistant_editor_page():
                 with st.spinner("Deleting agent..."):
                     if delete_assistant(assistant_id):
                         st.success("✅ Agent deleted successfully!")
-                        st.cache_data.clear()
                         time.sleep(1)
                         st.rerun()
                     else:
@@ -538,34 +3031,31 @@ def assistant_editor_page():
             st.subheader(f"Editing: {st.session_state.selected_agent_name}")
             
             # Extract current values
-            current_name = config.get('name', selected_agent_name.split(' (')[0])
-            current_first_message = config.get('firstMessage', '')
-            current_background_sound = config.get('backgroundSound', 'office')
-            current_background_denoise = config.get('backgroundDenoisingEnabled', False)
-            current_end_call_phrases = config.get('endCallPhrases', [])
-            current_silence_timeout = config.get('silenceTimeoutSeconds', 10)
-            current_max_duration = config.get('maxDurationSeconds', 600)
-            current_record_enabled = config.get('recordingEnabled', False)
-            current_hipaa_enabled = config.get('hipaaEnabled', False)
-            current_server_url = config.get('serverUrl', '')
-            current_server_secret = config.get('serverSecret', '')
+            current = get_editor_values(config, selected_agent_name.split(' (')[0])
+            current_name = current['name']
+            current_first_message = current['firstMessage']
+            current_background_sound = current['backgroundSound']
+            current_background_denoise = current['backgroundDenoisingEnabled']
+            current_end_call_phrases = current['endCallPhrases']
+            current_silence_timeout = current['silenceTimeoutSeconds']
+            current_max_duration = current['maxDurationSeconds']
+            current_record_enabled = current['recordingEnabled']
+            current_hipaa_enabled = current['hipaaEnabled']
+            current_server_url = current['serverUrl']
+            current_server_secret = current['serverSecret']
             
-            model_config = config.get('model', {})
-            current_system_prompt = get_system_prompt(config)
-            current_model = model_config.get('model', 'gpt-4o')
-            current_temperature = model_config.get('temperature', 0.7)
-            # <CHANGE> Fixed max tokens - use min of current value and 4000 to avoid error
-            current_max_tokens = min(model_config.get('maxTokens', 2000), 4000)
+            current_system_prompt = current['systemPrompt']
+            current_model = current['model']['model']
+            current_temperature = current['model']['temperature']
+            current_max_tokens = current['model']['maxTokens']
             
-            voice_config = config.get('voice', {})
-            current_voice_provider = voice_config.get('provider', 'playht')
-            current_voice_id = voice_config.get('voiceId', 'andrew')
-            current_voice_speed = voice_config.get('speed', 1.0)
+            current_voice_provider = current['voice']['provider']
+            current_voice_id = current['voice']['voiceId']
+            current_voice_speed = current['voice']['speed']
             
-            transcriber_config = config.get('transcriber', {})
-            current_transcriber_provider = transcriber_config.get('provider', 'deepgram')
-            current_transcriber_model = transcriber_config.get('model', 'base')
-            current_transcriber_language = transcriber_config.get('language', 'en')
+            current_transcriber_provider = current['transcriber']['provider']
+            current_transcriber_model = current['transcriber']['model']
+            current_transcriber_language = current['transcriber']['language']
             
             with st.form("agent_editor_form"):
                 tab1, tab2, tab3, tab4, tab5 = st.tabs(
@@ -714,73 +3204,30 @@ def assistant_editor_page():
                 with col4:
                     reset = st.form_submit_button("🔄 Reset", use_container_width=True)
                 
+                edits = {
+                    "name": new_name,
+                    "serverUrl": new_server_url,
+                    "serverSecret": new_server_secret,
+                    "backgroundSound": new_background_sound,
+                    "backgroundDenoisingEnabled": new_background_denoise,
+                    "firstMessage": new_first_message,
+                    "endCallPhrases": new_end_call_phrases,
+                    "silenceTimeoutSeconds": new_silence_timeout,
+                    "maxDurationSeconds": new_max_duration,
+                    "systemPrompt": new_system_prompt,
+                    "model": {"model": new_model, "temperature": new_temperature, "maxTokens": new_max_tokens},
+                    "transcriber": {
+                        "provider": new_transcriber_provider,
+                        "model": new_transcriber_model,
+                        "language": new_transcriber_language
+                    },
+                    "voice": {"provider": new_voice_provider, "voiceId": new_voice_id, "speed": new_voice_speed},
+                    "recordingEnabled": new_record_enabled,
+                    "hipaaEnabled": new_hipaa_enabled,
+                }
+                
                 if submitted:
-                    payload = {}
-                    
-                    if new_name != current_name:
-                        payload['name'] = new_name
-                    if new_server_url != current_server_url:
-                        payload['serverUrl'] = new_server_url
-                    if new_server_secret != current_server_secret:
-                        payload['serverSecret'] = new_server_secret
-                    
-                    if new_background_sound != current_background_sound:
-                        payload['backgroundSound'] = new_background_sound
-                    if new_background_denoise != current_background_denoise:
-                        payload['backgroundDenoisingEnabled'] = new_background_denoise
-                    
-                    if new_first_message != current_first_message:
-                        payload['firstMessage'] = new_first_message
-                    if new_end_call_phrases != current_end_call_phrases:
-                        payload['endCallPhrases'] = new_end_call_phrases
-                    
-                    if new_silence_timeout != current_silence_timeout:
-                        payload['silenceTimeoutSeconds'] = new_silence_timeout
-                    if new_max_duration != current_max_duration:
-                        payload['maxDurationSeconds'] = new_max_duration
-                    
-                    model_payload = {}
-                    if new_model != current_model:
-                        model_payload['model'] = new_model
-                    if new_temperature != current_temperature:
-                        model_payload['temperature'] = new_temperature
-                    if new_max_tokens != current_max_tokens:
-                        model_payload['maxTokens'] = new_max_tokens
-                    
-                    temp_config = json.loads(json.dumps(config))
-                    set_system_prompt(temp_config, new_system_prompt)
-                    if temp_config.get('model', {}).get('messages') != config.get('model', {}).get('messages'):
-                        model_payload['messages'] = temp_config['model']['messages']
-                    
-                    if model_payload:
-                        payload['model'] = model_payload
-                    
-                    transcriber_payload = {}
-                    if new_transcriber_provider != current_transcriber_provider:
-                        transcriber_payload['provider'] = new_transcriber_provider
-                    if new_transcriber_model != current_transcriber_model:
-                        transcriber_payload['model'] = new_transcriber_model
-                    if new_transcriber_language != current_transcriber_language:
-                        transcriber_payload['language'] = new_transcriber_language
-                    
-                    if transcriber_payload:
-                        payload['transcriber'] = transcriber_payload
-                    
-                    voice_payload = {}
-                    if new_voice_provider != current_voice_provider:
-                        voice_payload['provider'] = new_voice_provider
-                    if new_voice_id != current_voice_id:
-                        voice_payload['voiceId'] = new_voice_id
-                    if new_voice_speed != current_voice_speed:
-                        voice_payload['speed'] = new_voice_speed
-                    
-                    if voice_payload:
-                        payload['voice'] = voice_payload
-                    
-                    if new_record_enabled != current_record_enabled:
-                        payload['recordingEnabled'] = new_record_enabled
-                    if new_hipaa_enabled != current_hipaa_enabled:
-                        payload['hipaaEnabled'] = new_hipaa_enabled
+                    payload = build_assistant_payload(config, edits, current)
                     
                     if payload:
                         st.info("📋 Payload to be sent:")
@@ -796,7 +3243,18 @@ def assistant_editor_page():
                 
                 if preview:
                     st.subheader("Configuration Preview")
-                    st.json(config)
+                    payload = build_assistant_payload(config, edits, current)
+                    preview_config = apply_merge_patch(config, payload)
+                    changes = diff_paths(config, preview_config)
+                    if changes:
+                        st.caption(f"{len(changes)} unsaved change(s)")
+                        st.dataframe(pd.DataFrame([
+                            {"Field": format_path(path), "Current": describe_config_value(old), "New": describe_config_value(new)}
+                            for path, old, new in changes
+                        ]), use_container_width=True, hide_index=True)
+                    else:
+                        st.caption("No unsaved changes.")
+                    st.json(preview_config)
                 
                 if export:
                     st.download_button(
@@ -811,12 +3269,98 @@ def assistant_editor_page():
                     st.rerun()
         else:
             st.info("📌 Please select an agent and click 'Load Agent Configuration' to begin editing.")
+        
+        render_config_history(assistant_id)
 
+@profiled("page")
+def bulk_operations_page():
+    """Apply one change, clone or delete across many assistants."""
+    st.header("🧰 Bulk Operations")
+    
+    registry = get_agent_registry()
+    live_labels = [label for label in registry.labels if registry.agents[label]['live']]
+    select_all = st.checkbox("Select all live assistants")
+    selected_labels = st.multiselect("Assistants", registry.labels, default=live_labels if select_all else [])
+    
+    operation_name = st.radio("Operation", ["Patch", "Clone", "Delete"], horizontal=True)
+    max_workers = st.slider("Parallel Requests", 1, 16, BULK_MAX_WORKERS)
+    
+    edits = {}
+    if operation_name == "Patch":
+        st.caption("Tick the fields to change; each assistant only receives the fields that differ from its config.")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.checkbox("System Prompt"):
+                edits["systemPrompt"] = st.text_area("New System Prompt", height=150)
+            if st.checkbox("First Message"):
+                edits["firstMessage"] = st.text_area("New First Message", height=80)
+            if st.checkbox("Recording"):
+                edits["recordingEnabled"] = st.toggle("Enable Call Recording")
+        with col2:
+            if st.checkbox("LLM Model"):
+                edits.setdefault("model", {})["model"] = st.text_input("New Model", value="gpt-4o")
+            if st.checkbox("Temperature"):
+                edits.setdefault("model", {})["temperature"] = st.slider("New Temperature", 0.0, 2.0, 0.7, 0.1)
+            if st.checkbox("Voice"):
+                edits["voice"] = {
+                    "provider": st.selectbox("New Voice Provider", ['playht', 'elevenlabs', 'azure', 'rime-ai', 'deepgram']),
+                    "voiceId": st.text_input("New Voice ID", value="andrew"),
+                }
+        operation = bulk_patch(edits)
+    elif operation_name == "Clone":
+        operation = bulk_clone
+    else:
+        operation = bulk_delete
+        st.warning("⚠️ Deleting assistants cannot be undone.")
+    
+    confirmed = operation_name != "Delete" or st.checkbox(f"Yes, delete {len(selected_labels)} assistants")
+    
+    def run(assistant_ids, retry=False):
+        progress = st.progress(0.0, text="Starting...")
+        
+        def on_progress(done, total, assistant_id, outcome):
+            progress.progress(done / total, text=f"{done}/{total} · {registry.by_id.get(assistant_id, assistant_id)}")
+        
+        results = run_bulk_operation(operation, assistant_ids, max_workers, on_progress)
+        if retry:
+            results = {**st.session_state.bulk_results, **results}
+        st.session_state.bulk_results = results
+        st.session_state.bulk_operation = operation_name
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        ready = selected_labels and confirmed and (edits or operation_name != "Patch")
+        if st.button(f"▶️ Run {operation_name}", type="primary", use_container_width=True, disabled=not ready):
+            run([registry.ids[label] for label in selected_labels])
+    
+    results = st.session_state.get('bulk_results', {})
+    failed = [assistant_id for assistant_id, outcome in results.items() if not outcome['ok']]
+    # Retrying only makes sense with the operation that produced the failures
+    can_retry = failed and confirmed and st.session_state.get('bulk_operation') == operation_name
+    with col2:
+        if st.button(f"🔁 Retry {len(failed)} Failed", use_container_width=True, disabled=not can_retry):
+            run(failed, retry=True)
+            results = st.session_state.bulk_results
+    
+    if results:
+        succeeded = sum(outcome['ok'] for outcome in results.values())
+        st.subheader(f"Results: {succeeded} succeeded, {len(results) - succeeded} failed")
+        st.dataframe(pd.DataFrame([
+            {
+                "Assistant": registry.by_id.get(assistant_id, assistant_id),
+                "Status": "✅" if outcome['ok'] else "❌",
+                "Result": outcome['result'] or outcome['error'],
+            }
+            for assistant_id, outcome in results.items()
+        ]), use_container_width=True, hide_index=True)
+
+@profiled("page")
 def phone_number_manager_page():
     """Phone number management."""
     st.header("📞 Phone Number Manager")
     
     phone_numbers = list_phone_numbers()
+    render_listing_age("phone-numbers")
     if not phone_numbers:
         st.warning("No phone numbers found.")
         return
@@ -842,8 +3386,7 @@ def phone_number_manager_page():
     if selected_phone:
         selected_phone_id = phone_options[selected_phone]
         
-        combined_agents = get_agent_list()
-        agent_options = {f"{name} ({details['id'][:8]}...)": details['id'] for name, details in combined_agents.items()}
+        agent_options = {f"{name} ({agent_id[:8]}...)": agent_id for name, agent_id in get_agent_registry().ids.items()}
         
         new_assistant = st.selectbox("Assign New Assistant", list(agent_options.keys()))
         
@@ -853,61 +3396,211 @@ def phone_number_manager_page():
             
             if update_phone_number(selected_phone_id, payload):
                 st.success(f"✅ Successfully assigned {new_assistant} to {selected_phone}!")
-                st.cache_data.clear()
                 time.sleep(1)
                 st.rerun()
 
+@profiled("page")
 def call_logs_page():
     """Call logs and analytics."""
     st.header("📞 Call Logs & Analytics")
     
-    combined_agents = get_agent_list()
-    agent_options = {f"{name}": details['id'] for name, details in combined_agents.items()}
+    registry = get_agent_registry()
+    agent_options = registry.ids
     
     col1, col2 = st.columns([3, 1])
     with col1:
-        filter_agent = st.selectbox("Filter by Assistant", ["All Assistants"] + sorted(list(agent_options.keys())))
+        filter_agent = st.selectbox("Filter by Assistant", ["All Assistants"] + registry.labels)
     with col2:
-        if st.button("🔄 Refresh", use_container_width=True):
-            st.cache_data.clear()
+        force_sync = st.button("🔄 Refresh", use_container_width=True)
     
     filter_assistant_id = agent_options.get(filter_agent) if filter_agent != "All Assistants" else None
     
-    with st.spinner("Fetching call logs..."):
-        calls = list_calls(assistant_id=filter_assistant_id, limit=200)
-    
-    if not calls:
+    with st.expander("🔎 Filters & Sorting", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            statuses = st.multiselect("Status", CALL_STATUSES)
+            phone = st.text_input("Phone Number Contains").strip()
+        with col2:
+            date_range = st.date_input("Date Range", value=())
+            min_duration, max_duration = st.slider("Duration (seconds)", 0, 3600, (0, 3600), step=30)
+        with col3:
+            sort_label = st.selectbox("Sort By", list(CALL_SORT_COLUMNS))
+            descending = st.toggle("Descending", value=True)
+            page_size = st.selectbox("Rows per Page", [25, 50, 100, 250], index=1)
+    
+    with st.expander("📦 Export Calls"):
+        st.caption("Streams calls for the selected assistant to a file on the server, page by page, "
+                   "so long periods export in constant memory. Interrupted exports resume where they stopped.")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            export_format = st.radio("Format", list(EXPORT_FORMATS), horizontal=True,
+                                     format_func={"jsonl": "JSONL (gzip)", "parquet": "Parquet"}.get)
+        with col2:
+            export_days = st.number_input("Days Back", min_value=1, max_value=3650, value=90)
+        with col3:
+            export_details = st.checkbox("Full call details", value=True, help="Fetches each call, including transcripts")
+        
+        path = export_path(export_format, filter_assistant_id, export_days)
+        checkpoint = read_export_checkpoint(path)
+        if checkpoint and checkpoint['complete']:
+            st.success(f"✅ Last export: {checkpoint['rows']} calls in `{path}`")
+        elif checkpoint:
+            st.warning(f"⏸️ Unfinished export: {checkpoint['rows']} calls written, back to {checkpoint['created_at']}")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            start_export = st.button("📦 Start Export", use_container_width=True)
+        with col2:
+            resume_export = st.button("⏯️ Resume Export", use_container_width=True,
+                                      disabled=not checkpoint or checkpoint['complete'])
+        client = get_vapi_client()
+        if (start_export or resume_export) and client:
+            progress = st.empty()
+            started = time.monotonic()
+            
+            def show_progress(state):
+                progress.caption(f"Exported {state['rows']} calls, back to {state['created_at']} "
+                                 f"({state['rows'] / max(time.monotonic() - started, 1e-9):.0f} calls/s)")
+            
+            try:
+                result = export_calls(
+                    client, path, export_format,
+                    since=datetime.now().astimezone() - timedelta(days=export_days),
+                    assistant_id=filter_assistant_id, details=export_details, resume=resume_export,
+                    on_page=show_progress
+                )
+                progress.success(f"✅ Exported {result['rows']} calls to `{path}`")
+            except requests.exceptions.RequestException as e:
+                handle_api_error(e, "Exporting Calls")
+                st.info("ℹ️ Everything written so far is kept; use Resume Export to continue.")
+            except ImportError:
+                st.error("❌ Parquet export needs pyarrow: `pip install pyarrow`")
+    
+    # Filtering, sorting and paging run against the local store's frame; only
+    # the visible page is formatted and sent to the browser
+    store = get_call_store()
+    status_slot = st.empty()
+    table_slot = st.empty()
+    pager_slot = st.empty()
+    
+    def render_calls(page_number):
+        filtered = filter_call_frame(
+            get_call_frame(), filter_assistant_id, statuses, date_range, phone,
+            min_duration, max_duration if max_duration < 3600 else None
+        )
+        page_count = max(1, -(-len(filtered) // page_size))
+        page_number = min(page_number, page_count)
+        ordered = filtered.sort_values(CALL_SORT_COLUMNS[sort_label], ascending=not descending, na_position="last")
+        start = (page_number - 1) * page_size
+        page = ordered.iloc[start:start + page_size]
+        if len(page):
+            table_slot.dataframe(format_call_log_table(page), use_container_width=True, hide_index=True)
+        return filtered, page, page_number, page_count
+    
+    # The pager is drawn below the table, so its value is read from session state first; that way
+    # each rerun filters and sorts once, for the page on show
+    requested_page = st.session_state.get("call_log_page", 1)
+    filtered, page, page_number, page_count = render_calls(requested_page)
+    synced = 0
+    last_render = time.monotonic()
+    for page_calls in sync_calls(force=force_sync):
+        synced += page_calls
+        status_slot.caption(f"Syncing call logs... {synced} calls fetched")
+        if time.monotonic() - last_render > 1:
+            filtered, page, page_number, page_count = render_calls(requested_page)
+            last_render = time.monotonic()
+    
+    if synced:
+        filtered, page, page_number, page_count = render_calls(requested_page)
+    if page_number != requested_page:
+        # Clamped after filtering or syncing shrank the results
+        st.session_state["call_log_page"] = page_number
+    with pager_slot.container():
+        # Keyed and without page-count-dependent arguments, so its identity and value survive new data
+        st.number_input("Page", min_value=1, step=1, key="call_log_page")
+    
+    if not len(filtered):
+        status_slot.empty()
         st.info("No calls found for the selected filter.")
         return
-    
-    data = []
-    for call in calls:
-        duration = call.get('duration', 0)
-        duration_str = f"{duration // 60}m {duration % 60}s" if duration else "N/A"
-        
-        data.append({
-            "ID": call.get('id', 'N/A')[:12] + '...',
-            "Duration": duration_str,
-            "From": call.get('customerNumber', 'N/A'),
-            "To": call.get('phoneNumber', 'N/A'),
-            "Status": call.get('status', 'N/A'),
-            "Date": datetime.fromisoformat(call['createdAt'].replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M') if 'createdAt' in call else 'N/A'
-        })
-    
-    st.dataframe(pd.DataFrame(data), use_container_width=True, hide_index=True)
+    status_slot.caption(f"{len(filtered)} matching calls of {store.count()} stored · page {page_number} of {page_count}")
     
     # Call details viewer
     st.divider()
     st.subheader("View Full Call Details")
     
-    call_ids = [call.get('id') for call in calls]
+    call_ids = page['id'].tolist()
+    visible_ids = call_ids[:PREFETCH_PAGE_SIZE]
+    prefetch_call_details(visible_ids)
     selected_call_id = st.selectbox("Select Call ID", call_ids, format_func=lambda x: x[:12] + '...')
     
     if st.button("📋 Get Full Details", use_container_width=True):
         details = get_call_details(selected_call_id)
         if details:
             st.json(details)
+    
+    cache = get_api_cache()
+    prefetched = {call_id: cache.peek("call-details", call_id) for call_id in visible_ids}
+    prefetched = {call_id: details for call_id, details in prefetched.items() if details is not None}
+    with st.expander(f"📝 Transcripts & Costs ({len(prefetched)}/{len(visible_ids)} prefetched)"):
+        if prefetched:
+            st.dataframe(pd.DataFrame([
+                {
+                    "ID": call_id[:12] + '...',
+                    "Cost": details.get('cost'),
+                    "Ended Reason": details.get('endedReason', 'N/A'),
+                    "Transcript": get_transcript(details)[:200],
+                }
+                for call_id, details in prefetched.items()
+            ]), use_container_width=True, hide_index=True)
+        else:
+            st.caption("Call details are being fetched in the background; rerun to refresh.")
+
+@profiled("page")
+def transcript_search_page():
+    """Full-text search over locally indexed call transcripts."""
+    st.header("🔍 Transcript Search")
+    
+    store = get_call_store()
+    registry = get_agent_registry()
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        query = st.text_input("Search Transcripts", placeholder="e.g. refund request")
+    with col2:
+        filter_agent = st.selectbox("Assistant", ["All Assistants"] + registry.labels)
+    advanced = st.toggle("FTS5 query syntax", help="Use AND/OR/NOT, \"phrases\", prefix* and NEAR() directly.")
+    
+    indexed = store.transcript_count()
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.caption(f"{indexed} of {store.count()} stored calls have indexed transcripts. "
+                   "Transcripts are indexed as calls sync and call details are fetched.")
+    with col2:
+        if st.button("📥 Index Recent Calls", use_container_width=True):
+            missing = store.unindexed_call_ids(PREFETCH_PAGE_SIZE * 4)
+            prefetch_call_details(missing)
+            st.toast(f"Fetching details for {len(missing)} calls in the background")
+    
+    if not query.strip():
+        return
+    
+    # Plain queries match every word, quoted so punctuation can't break FTS5 syntax
+    match = query if advanced else " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+    started = time.perf_counter()
+    try:
+        hits = store.search_transcripts(match, registry.ids.get(filter_agent))
+    except sqlite3.OperationalError as e:
+        st.error(f"❌ Invalid search query: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    st.caption(f"{len(hits)} matches in {elapsed_ms:.1f} ms")
+    for call_id, assistant_id, status, created_at, snippet in hits:
+        agent = registry.by_id.get(assistant_id, assistant_id or 'Unknown')
+        st.markdown(f"**`{call_id[:12]}...`** · {agent} · {status} · {created_at[:16].replace('T', ' ')}  \n{snippet}")
 
+@profiled("page")
 def squads_tools_page():
     """Squads and tools management."""
     st.header("👥 Squads & Tools Manager")
@@ -918,6 +3611,7 @@ def squads_tools_page():
         st.subheader("Assistant Squads (Groups)")
         
         squads = list_squads()
+        render_listing_age("squads")
         if squads:
             squad_data = []
             for squad in squads:
@@ -938,8 +3632,7 @@ def squads_tools_page():
             squad_name = st.text_input("Squad Name")
             routing_strategy = st.selectbox("Routing Strategy", ["sequential", "round-robin", "random"])
             
-            combined_agents = get_agent_list()
-            agent_options = {f"{name}": details['id'] for name, details in combined_agents.items()}
+            agent_options = get_agent_registry().ids
             selected_agents = st.multiselect("Select Assistants", list(agent_options.keys()))
             
             if st.form_submit_button("✅ Create Squad", type="primary", use_container_width=True):
@@ -952,7 +3645,6 @@ def squads_tools_page():
                     
                     if create_squad(payload):
                         st.success(f"✅ Squad '{squad_name}' created successfully!")
-                        st.cache_data.clear()
                         time.sleep(1)
                         st.rerun()
                 else:
@@ -962,6 +3654,7 @@ def squads_tools_page():
         st.subheader("Custom Tools/Functions")
         
         tools = list_tools()
+        render_listing_age("tools")
         if tools:
             tool_data = []
             for tool in tools:
@@ -975,6 +3668,7 @@ def squads_tools_page():
         else:
             st.info("No custom tools found.")
 
+@profiled("page")
 def settings_page():
     """Settings and system info."""
     st.header("⚙️ Settings & System Info")
@@ -992,6 +3686,7 @@ def settings_page():
     st.subheader("System Logs")
     
     logs = list_logs(limit=50)
+    render_listing_age("logs", 50)
     if logs:
         log_data = []
         for log in logs:
@@ -1003,9 +3698,102 @@ def settings_page():
         st.dataframe(pd.DataFrame(log_data), use_container_width=True)
     else:
         st.info("No system logs available.")
+    
+    st.divider()
+    st.subheader("📈 Performance")
+    
+    metrics = get_request_metrics()
+    endpoints = metrics.endpoint_frame()
+    cache_stats = metrics.cache_frame()
+    recent = pd.DataFrame(metrics.recent(), columns=["time", "method", "endpoint", "status", "bytes", "latency", "retries"])
+    
+    total_requests = int(endpoints["requests"].sum())
+    lookups = int(cache_stats["hits"].sum() + cache_stats["misses"].sum())
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("API Requests", total_requests, delta=None)
+    with col2:
+        st.metric("Error Rate", f"{endpoints['errors'].sum() / total_requests:.1%}" if total_requests else "N/A", delta=None)
+    with col3:
+        st.metric("p95 Latency", f"{recent['latency'].quantile(0.95) * 1000:.0f}ms" if len(recent) else "N/A", delta=None)
+    with col4:
+        st.metric("Cache Hit Ratio", f"{cache_stats['hits'].sum() / lookups:.1%}" if lookups else "N/A", delta=None)
+    st.caption(f"Since {datetime.fromtimestamp(metrics.started_at).strftime('%Y-%m-%d %H:%M:%S')}; "
+               f"percentiles cover the last {len(recent)} requests.")
+    
+    if total_requests:
+        st.caption("Endpoints (slowest total time first)")
+        st.dataframe(endpoints.round(1), use_container_width=True, hide_index=True)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption("Latency Histogram")
+            st.bar_chart(metrics.latency_histogram())
+        with col2:
+            st.caption("API Cache")
+            st.dataframe(cache_stats.round(3), use_container_width=True, hide_index=True)
+            backend = get_api_cache().backend
+            if backend is not None:
+                stored = backend.stats()
+                st.caption(f"Shared {backend.name} backend: {stored['entries']} entries, "
+                           f"{stored['bytes'] / 1024 / 1024:.1f} of {backend.max_bytes / 1024 / 1024:.0f} MB")
+
+        with st.expander("Recent Requests"):
+            recent = recent.iloc[::-1].head(100)
+            recent["time"] = recent["time"].map(lambda stamp: datetime.fromtimestamp(stamp).strftime("%H:%M:%S.%f")[:-3])
+            recent["latency"] = (recent["latency"] * 1000).round(1)
+            st.dataframe(recent.rename(columns={"latency": "latency_ms"}), use_container_width=True, hide_index=True)
+    else:
+        st.info("No API requests recorded yet.")
+    
+    startup = get_startup_report().summary()
+    
+    def seconds(value):
+        return f"{value:.2f}s" if value is not None else "N/A"
+    
+    st.caption("🚀 Startup")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Process → First Render", seconds(startup['process_first_render']), delta=None,
+                  help="From process start, including interpreter and server startup")
+    with col2:
+        st.metric("First Run Imports", seconds(startup['first_run'] and startup['first_run']['imports']), delta=None)
+    with col3:
+        st.metric("Session First Render p50", seconds(startup['session_first_render']['p50']), delta=None,
+                  help=f"p95 {seconds(startup['session_first_render']['p95'])} over "
+                       f"{startup['session_first_render']['count']} sessions")
+    with col4:
+        st.metric("Rerun p50", seconds(startup['rerun']['p50']), delta=None,
+                  help=f"p95 {seconds(startup['rerun']['p95'])} over {startup['rerun']['count']} reruns")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("⬇️ Export JSON", metrics.to_json(startup=startup), file_name="vapi_metrics.json",
+                           mime="application/json")
+    with col2:
+        st.download_button("⬇️ Export Prometheus", metrics.to_prometheus() + get_startup_report().to_prometheus(),
+                           file_name="vapi_metrics.prom", mime="text/plain")
+    with col3:
+        if st.button("🔄 Reset Metrics"):
+            metrics.reset()
+            st.rerun()
+
+# Sidebar label -> page; only the selected page runs on a rerun
+PAGES = {
+    "Dashboard": dashboard_page,
+    "Assistant Editor": assistant_editor_page,
+    "Bulk Operations": bulk_operations_page,
+    "Phone Number Manager": phone_number_manager_page,
+    "Call Logs": call_logs_page,
+    "Transcript Search": transcript_search_page,
+    "Squads & Tools": squads_tools_page,
+    "Settings": settings_page,
+}
 
 def main():
     """Main app entry point."""
+    started = time.perf_counter()
+    setup_page()
     st.title("🤖 Vapi Agent Configuration Editor")
     st.markdown("Comprehensive tool to manage your Vapi assistants, phone numbers, calls, and more.")
     
@@ -1017,27 +3805,31 @@ def main():
     
     # Sidebar navigation
     st.sidebar.title("🗂️ Navigation")
-    page = st.sidebar.radio(
-        "Go to",
-        ["Dashboard", "Assistant Editor", "Phone Number Manager", "Call Logs", "Squads & Tools", "Settings"],
-        index=0
-    )
+    page = st.sidebar.radio("Go to", list(PAGES), index=0)
     
     st.sidebar.divider()
     
-    # Page routing
-    if page == "Dashboard":
-        dashboard_page()
-    elif page == "Assistant Editor":
-        assistant_editor_page()
-    elif page == "Phone Number Manager":
-        phone_number_manager_page()
-    elif page == "Call Logs":
-        call_logs_page()
-    elif page == "Squads & Tools":
-        squads_tools_page()
-    elif page == "Settings":
-        settings_page()
+    profiler = None
+    profile_mode = os.environ.get(PROFILE_ENV_VAR, "").lower()
+    if st.sidebar.toggle("⏱️ Profile reruns", value=profile_mode not in ("", "0", "false"), key="profile_reruns"):
+        use_cprofile = st.sidebar.checkbox("Include cProfile", value=profile_mode == "cprofile", key="profile_cprofile")
+        profiler = RerunProfiler(started, use_cprofile=use_cprofile)
+        profiler.add_span("setup", "setup", started, time.perf_counter())
+        profiler.activate()
+    
+    try:
+        PAGES[page]()
+    finally:
+        if profiler is not None:
+            profiler.deactivate()
+    
+    if profiler is not None:
+        render_rerun_profile(profiler)
+    
+    first_in_session = 'first_render_at' not in st.session_state
+    if first_in_session:
+        st.session_state.first_render_at = time.time()
+    get_startup_report().record_run(SCRIPT_STARTED, SCRIPT_IMPORTED, time.perf_counter(), first_in_session)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,369 @@
+"""End-to-end benchmarks for app.py against the offline mock Vapi server.
+
+Each scenario drives the app's own helpers (the pooled client, call pagination,
+the local call store, analytics frames, bulk operations, call exports, the async
+client) or whole pages through Streamlit's ``AppTest``, and reports latency
+percentiles and throughput over ``--repeat`` runs. The mock adds ``--latency``
+per request so serial versus concurrent fetching shows up the way it does
+against the real API.
+
+Run ``python benchmarks.py`` for every scenario or ``-k page -k store`` for a
+subset. ``--json results.json`` saves a run; ``--baseline results.json``
+compares against a saved run and exits non-zero when a scenario's median
+regressed by more than ``--tolerance``.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import mock_vapi
+
+logger = logging.getLogger(__name__)
+
+API_KEY = "bench-key"
+PAGES = ["Dashboard", "Assistant Editor", "Bulk Operations", "Phone Number Manager", "Call Logs",
+         "Transcript Search", "Squads & Tools", "Settings"]
+SCENARIOS = {}
+
+
+def scenario(name):
+    """Registers ``setup(env)``, which prepares untimed state and returns the timed ``run()``.
+
+    ``run()`` may return a number of items processed, reported as throughput.
+    """
+    def register(setup):
+        SCENARIOS[name] = setup
+        return setup
+    return register
+
+
+class BenchEnv:
+    """Shared mock server and scratch directory for one benchmark session."""
+
+    def __init__(self, server, workdir):
+        self.server = server
+        self.url = server.url
+        self.workdir = workdir
+        self._counter = itertools.count()
+
+    def client(self, **kwargs):
+        """A client configured like the app's, pointed at the mock server."""
+        import app
+        return app.VapiClient(API_KEY, base_url=self.url, **kwargs)
+
+    def path(self, name):
+        return os.path.join(self.workdir, f"{name}-{next(self._counter)}")
+
+    def synced_store(self):
+        import app
+        store = app.CallStore(os.path.join(self.path("store"), "calls.sqlite3"))
+        for _ in store.sync(self.client()):
+            pass
+        return store
+
+
+# --- Client & API Helpers ---
+@scenario("client.list_assistants")
+def _list_assistants(env):
+    client = env.client()
+    return lambda: len(client.get("/assistant", params={"limit": 100}).json())
+
+
+@scenario("calls.paginate_all")
+def _paginate_all(env):
+    import app
+    client = env.client()
+    since = datetime.now().astimezone() - timedelta(days=app.CALL_BACKFILL_DAYS)
+    return lambda: sum(len(page) for page in app._iter_call_pages(client, since=since, page_size=app.MAX_CALL_PAGE_SIZE))
+
+
+@scenario("dashboard.fetch_serial")
+def _fetch_serial(env):
+    client = env.client()
+    paths = ["/assistant", "/call", "/phone-number", "/squad"]
+    return lambda: sum(len(client.get(path).json()) for path in paths)
+
+
+@scenario("dashboard.fetch_concurrent")
+def _fetch_concurrent(env):
+    import app
+    client = env.client()
+    fetches = {path: (lambda path=path: client.get(path).json()) for path in ["/assistant", "/call", "/phone-number", "/squad"]}
+    return lambda: sum(len(result) for _, result, _ in app.fetch_concurrently(fetches))
+
+
+@scenario("dashboard.stampede")
+def _stampede(env):
+    """40 sessions rerunning at once right after the assistants listing expired."""
+    import app
+    client = env.client()
+    cache = app.ApiCache()
+    sessions = 40
+
+    def load():
+        return cache.get_or_load("assistants", 100, lambda: client.get("/assistant", params={"limit": 100}).json(),
+                                 ttl=app.LISTING_MAX_STALE)
+
+    def run():
+        cache.invalidate("assistants")
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            results = [future.result() for future in [pool.submit(load) for _ in range(sessions)]]
+        return len(results)
+    return run
+
+
+@scenario("client.rate_limited")
+def _rate_limited(env):
+    """A client allowed 20 req/s against a server that answers 429 above 5 req/s."""
+    import app
+    server = mock_vapi.start(dataset=env.server.dataset, rate_limit=5)
+    metrics = app.RequestMetrics()
+    client = app.VapiClient(API_KEY, base_url=server.url, rate_limiter=app.TokenBucket(20, 20), metrics=metrics)
+
+    def run():
+        for _ in range(20):
+            client.get("/tool")
+        return 20
+    return run
+
+
+@scenario("assistants.bulk_patch")
+def _bulk_patch(env):
+    import app
+    client = env.client()
+    cache = app.ApiCache()
+    assistant_ids = [assistant['id'] for assistant in client.get("/assistant").json()]
+    runs = itertools.count()
+
+    def run():
+        operation = app.bulk_patch({"systemPrompt": f"Benchmark prompt {next(runs)}"})
+        with ThreadPoolExecutor(max_workers=app.BULK_MAX_WORKERS) as pool:
+            results = list(pool.map(lambda assistant_id: operation(client, cache, assistant_id), assistant_ids))
+        return len(results)
+    return run
+
+
+@scenario("async.snapshot")
+def _async_snapshot(env):
+    from vapi_async import AsyncVapi, snapshot
+
+    async def take():
+        async with AsyncVapi(api_key=API_KEY, base_url=env.url, rate_limit=200) as api:
+            result = await snapshot(api, datetime.now().astimezone() - timedelta(days=1), call_limit=200)
+        return sum(len(items) for items in result.values())
+    return lambda: asyncio.run(take())
+
+
+# --- Local Call Store ---
+@scenario("store.cold_sync")
+def _cold_sync(env):
+    return lambda: env.synced_store().count()
+
+
+@scenario("store.delta_sync")
+def _delta_sync(env):
+    store = env.synced_store()
+    client = env.client()
+    return lambda: sum(store.sync(client))
+
+
+@scenario("store.call_frame_summary")
+def _call_frame_summary(env):
+    import app
+    store = env.synced_store()
+
+    def run():
+        frame = app.calls_frame_from_records(store.frame_records())
+        app.summarize_calls(frame)
+        return len(frame)
+    return run
+
+
+@scenario("store.rollups_90d")
+def _rollups(env):
+    store = env.synced_store()
+    since = datetime.now().astimezone() - timedelta(days=90)
+
+    def run():
+        store.ended_reason_totals(since)
+        return len(store.rollups(since, "day"))
+    return run
+
+
+@scenario("store.transcript_search")
+def _transcript_search(env):
+    store = env.synced_store()
+    return lambda: len(store.search_transcripts("refund", limit=100))
+
+
+# --- Call Export ---
+def _export_scenario(fmt):
+    def setup(env):
+        import app
+        client = env.client()
+        since = datetime.now().astimezone() - timedelta(days=app.CALL_BACKFILL_DAYS)
+        return lambda: app.export_calls(client, env.path("export") + app.EXPORT_FORMATS[fmt], fmt, since=since,
+                                        details=False)['rows']
+    return setup
+
+
+for _format in ("jsonl", "parquet"):
+    scenario(f"export.{_format}")(_export_scenario(_format))
+
+
+# --- Pages ---
+def _app_test():
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), default_timeout=120)
+    at.secrets["vapi_api_key"] = API_KEY
+    return at
+
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(f"page raised: {at.exception[0].value}")
+
+
+@scenario("app.cold_start")
+def _cold_start(env):
+    """First render of a fresh session with empty process caches and an empty call store."""
+    import streamlit as st
+
+    def run():
+        st.cache_resource.clear()
+        st.cache_data.clear()
+        os.environ["VAPI_CACHE_DIR"] = env.path("cold-cache")
+        _check(_app_test().run())
+    return run
+
+
+def _page_scenario(page):
+    def setup(env):
+        at = _app_test()
+        at.run()
+        at.sidebar.radio[0].set_value(page).run()
+        _check(at)
+        # Timed: a rerun of the page, which is what every widget interaction costs
+        return lambda: _check(at.run())
+    return setup
+
+
+for _page in PAGES:
+    scenario(f"page.{_page.lower().replace(' & ', '_').replace(' ', '_')}.rerun")(_page_scenario(_page))
+
+
+# --- Runner ---
+def run_scenario(name, env, repeat):
+    run = SCENARIOS[name](env)
+    timings = []
+    items = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        items = run()
+        timings.append(time.perf_counter() - started)
+    timings = np.array(timings) * 1000
+    median = float(np.median(timings))
+    return {
+        "runs": repeat,
+        "p50_ms": median,
+        "p95_ms": float(np.percentile(timings, 95)),
+        "min_ms": float(timings.min()),
+        "max_ms": float(timings.max()),
+        "items": items,
+        "items_per_s": items / median * 1000 if items and median else None,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Scenarios whose median is more than ``tolerance`` slower than the baseline's."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous and result["p50_ms"] > previous["p50_ms"] * (1 + tolerance):
+            regressions.append((name, previous["p50_ms"], result["p50_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app.py end to end against the mock Vapi server.")
+    parser.add_argument("-k", "--filter", action="append", default=[], help="only scenarios containing this text")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--assistants", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds the mock adds to every request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--json", help="write results to this path")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed median slowdown, as a fraction")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Bare-mode AppTest runs log every deprecated call and missing script context; keep the report readable.
+    # AppTest resets Streamlit's log levels on each run, so the loggers are disabled instead.
+    for name in ("streamlit.deprecation_util", "streamlit.runtime.scriptrunner_utils.script_run_context",
+                 "streamlit.runtime.caching.cache_data_api"):
+        logging.getLogger(name).disabled = True
+
+    names = [name for name in SCENARIOS if not args.filter or any(text in name for text in args.filter)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    workdir = tempfile.mkdtemp(prefix="vapi-bench-")
+    # Set before app.py is first imported or executed, so it targets the mock and a scratch cache
+    os.environ["VAPI_CACHE_DIR"] = os.path.join(workdir, "app-cache")
+    dataset = mock_vapi.MockDataset(assistants=args.assistants, calls=args.calls)
+    server = mock_vapi.start(dataset=dataset, latency=args.latency, jitter=args.jitter)
+    os.environ["VAPI_BASE_URL"] = server.url
+    env = BenchEnv(server, workdir)
+    logger.info("Mock Vapi on %s: %d assistants, %d calls, %.0fms latency", server.url, args.assistants, args.calls,
+                args.latency * 1000)
+
+    results = {}
+    for name in names:
+        started = time.perf_counter()
+        results[name] = run_scenario(name, env, args.repeat)
+        logger.info("%-36s p50 %8.1fms  (%.1fs)", name, results[name]["p50_ms"], time.perf_counter() - started)
+    server.shutdown()
+
+    table = pd.DataFrame.from_dict(results, orient="index")
+    print()
+    print(table.to_string(float_format=lambda value: f"{value:.1f}"))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "meta": {
+                    "created_at": datetime.now().astimezone().isoformat(),
+                    "python": platform.python_version(),
+                    "assistants": args.assistants,
+                    "calls": args.calls,
+                    "latency": args.latency,
+                    "repeat": args.repeat,
+                },
+                "results": results,
+            }, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p50 {before:.1f}ms -> {after:.1f}ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
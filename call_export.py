@@ -0,0 +1,68 @@
+"""Headless streaming export of Vapi calls for BI pipelines.
+
+Pages through /call newest-first, optionally fetching each call's full
+details, and appends every page to gzip JSONL or Parquet as it arrives. Memory
+stays at one page however many months are exported. A checkpoint next to the
+output records the oldest exported ``createdAt``, so ``--resume`` continues an
+interrupted export instead of starting over.
+
+Run ``python call_export.py --days 90 --format parquet --output calls.parquet``.
+The API key is read from ``VAPI_API_KEY``.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+from app import (EXPORT_FORMATS, RATE_LIMIT_PER_SECOND, VAPI_BASE_URL, TokenBucket, VapiClient,
+                 describe_api_error, export_calls)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream Vapi calls to gzip JSONL or Parquet.")
+    parser.add_argument("--output", required=True,
+                        help="output file for jsonl, or directory of part files for parquet")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="jsonl")
+    parser.add_argument("--days", type=float, default=30, help="how far back to export calls")
+    parser.add_argument("--assistant", help="only export calls of this assistant id")
+    parser.add_argument("--no-details", action="store_true", help="export the /call listing without fetching each call")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted export to --output")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT_PER_SECOND, help="max requests per second")
+    parser.add_argument("--base-url", default=VAPI_BASE_URL)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    client = VapiClient(os.environ["VAPI_API_KEY"], base_url=args.base_url,
+                        rate_limiter=TokenBucket(args.rate, burst=max(1, int(args.rate * 2))))
+    started = time.monotonic()
+
+    def progress(checkpoint):
+        logger.info("%d calls exported, back to %s (%.0f calls/s)", checkpoint['rows'], checkpoint['created_at'],
+                    checkpoint['rows'] / max(time.monotonic() - started, 1e-9))
+
+    try:
+        checkpoint = export_calls(
+            client, args.output, args.format,
+            since=datetime.now().astimezone() - timedelta(days=args.days),
+            assistant_id=args.assistant, details=not args.no_details, resume=args.resume, on_page=progress
+        )
+    except requests.exceptions.RequestException as e:
+        logger.error("Export interrupted: %s. Rerun with --resume to continue.", describe_api_error(e))
+        return 1
+    except KeyboardInterrupt:
+        logger.error("Export interrupted. Rerun with --resume to continue.")
+        return 130
+    finally:
+        client.close()
+    logger.info("Exported %d calls to %s", checkpoint['rows'], args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
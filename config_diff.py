@@ -0,0 +1,103 @@
+"""Structural diffs and JSON merge patches (RFC 7386) for assistant configs.
+
+The helpers walk the two documents key by key instead of serializing them:
+
+- ``merge_patch`` emits only the keys that differ.
+- ``apply_merge_patch`` builds the patched document and shares every
+  untouched subtree with the original.
+- ``minimize_patch`` drops the parts of a patch that would not change a
+  document. This is how editor values become a PATCH payload.
+- ``diff_paths`` lists the changes leaf by leaf for display.
+
+Merge patches replace lists whole and use ``None`` to delete a key, so a
+``null`` value cannot be set through them.
+"""
+
+
+class _Missing:
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+"""Stands in for the absent side of an added or removed key in ``diff_paths``."""
+
+
+def merge_patch(source, target):
+    """The minimal merge patch that turns ``source`` into ``target``."""
+    if not isinstance(source, dict) or not isinstance(target, dict):
+        return target
+    patch = {}
+    for key, value in target.items():
+        old = source.get(key, MISSING)
+        if old is value:
+            continue
+        if isinstance(old, dict) and isinstance(value, dict):
+            nested = merge_patch(old, value)
+            if nested:
+                patch[key] = nested
+        elif old is MISSING or old != value:
+            patch[key] = value
+    for key in source:
+        if key not in target:
+            patch[key] = None
+    return patch
+
+
+def apply_merge_patch(document, patch):
+    """Returns ``document`` with ``patch`` applied, leaving ``document`` untouched.
+
+    Only the dicts along patched paths are copied; everything else is shared
+    with ``document``, so treat the result as read-only or copy what you edit.
+    """
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(document) if isinstance(document, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def minimize_patch(document, patch):
+    """Drops the parts of ``patch`` that would leave ``document`` unchanged.
+
+    Useful for partial edits: keys the patch does not mention are kept, unlike
+    ``merge_patch(document, edited_document)``.
+    """
+    minimal = {}
+    for key, value in patch.items():
+        old = document.get(key, MISSING) if isinstance(document, dict) else MISSING
+        if value is None:
+            if old is not MISSING:
+                minimal[key] = None
+        elif isinstance(value, dict) and isinstance(old, dict):
+            nested = minimize_patch(old, value)
+            if nested:
+                minimal[key] = nested
+        elif old is MISSING or old != value:
+            minimal[key] = value
+    return minimal
+
+
+def diff_paths(source, target, path=()):
+    """Lists ``(path, old, new)`` for every changed leaf, ``path`` being a tuple of keys.
+
+    Added and removed keys have ``MISSING`` on the absent side; lists and other
+    non-dict values are compared whole.
+    """
+    if not isinstance(source, dict) or not isinstance(target, dict):
+        return [] if source is target or source == target else [(path, source, target)]
+    changes = []
+    for key in list(source) + [key for key in target if key not in source]:
+        old, new = source.get(key, MISSING), target.get(key, MISSING)
+        if old is not new:
+            changes += diff_paths(old, new, path + (key,))
+    return changes
+
+
+def format_path(path):
+    """``("model", "messages")`` -> ``"model.messages"``."""
+    return ".".join(str(key) for key in path)
@@ -0,0 +1,340 @@
+"""Offline stand-in for the Vapi API, for local development and benchmarks.
+
+Serves the endpoints app.py uses (assistants, calls, phone numbers, squads,
+tools, logs) from a seeded in-memory dataset. ``/call`` honours ``limit``,
+``assistantId`` and the ``createdAt`` Gt/Ge/Lt/Le bounds, newest first, so
+pagination behaves like the real API. Latency, a server-side rate limit
+(429 with ``Retry-After``) and random 5xx errors are configurable.
+
+Run ``python mock_vapi.py --calls 50000 --latency 0.05`` and start the app with
+``VAPI_BASE_URL=http://127.0.0.1:8787 streamlit run app.py`` (any API key is
+accepted), or use ``start()`` from Python.
+"""
+import argparse
+import bisect
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PORT = 8787
+MAX_PAGE_SIZE = 1000
+ENDED_REASONS = ["customer-ended-call", "assistant-ended-call", "silence-timed-out", "voicemail", "pipeline-error"]
+TRANSCRIPT_LINES = [
+    "AI: Thanks for calling, how can I help you today?",
+    "User: I'd like to check on my refund.",
+    "User: Can I book an appointment for next Tuesday?",
+    "AI: Sure, let me look that up for you.",
+    "User: My order never arrived.",
+    "AI: Is there anything else I can help with?",
+]
+
+logger = logging.getLogger(__name__)
+
+
+def _iso(moment):
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class MockDataset:
+    """Seeded in-memory Vapi org. Calls are spread evenly over the last ``days`` days."""
+
+    def __init__(self, assistants=20, calls=5000, phone_numbers=5, squads=3, tools=5, logs=200, days=30, seed=0):
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc)
+        self.lock = threading.Lock()
+        self.assistants = {}
+        for i in range(assistants):
+            assistant_id = f"asst-{i:04d}"
+            self.assistants[assistant_id] = {
+                "id": assistant_id,
+                "name": f"Agent {i}",
+                "firstMessage": "Hello! How can I help you today?",
+                "model": {
+                    "provider": "openai",
+                    "model": "gpt-4o",
+                    "temperature": 0.7,
+                    "maxTokens": 250,
+                    "messages": [{"role": "system", "content": f"You are support agent {i}."}],
+                },
+                "voice": {"provider": "11labs", "voiceId": "burt"},
+                "createdAt": _iso(now - timedelta(days=days + 1)),
+                "updatedAt": _iso(now - timedelta(days=days + 1)),
+            }
+        assistant_ids = list(self.assistants)
+
+        self.calls = {}
+        step = timedelta(days=days) / max(calls, 1)
+        for i in range(calls):
+            created_at = now - step * (calls - i)
+            duration = int(rng.expovariate(1 / 180))
+            ended = i < calls - 3
+            self.calls[f"call-{i:07d}"] = {
+                "id": f"call-{i:07d}",
+                "assistantId": assistant_ids[i % len(assistant_ids)] if assistant_ids else None,
+                "type": "inboundPhoneCall",
+                "status": "ended" if ended else "in-progress",
+                "endedReason": rng.choice(ENDED_REASONS) if ended else None,
+                "customerNumber": f"+1555{rng.randrange(10 ** 7):07d}",
+                "phoneNumber": "+15550000000",
+                "createdAt": _iso(created_at),
+                "startedAt": _iso(created_at + timedelta(seconds=2)),
+                "endedAt": _iso(created_at + timedelta(seconds=2 + duration)) if ended else None,
+                "cost": round(duration * 0.0012, 4),
+                "transcript": "\n".join(rng.sample(TRANSCRIPT_LINES, 3)),
+            }
+        # Sorted createdAt indexes (all calls, and per assistant) for bisecting page bounds
+        self._index = {None: sorted((call["createdAt"], call["id"]) for call in self.calls.values())}
+        for key in self._index[None]:
+            self._index.setdefault(self.calls[key[1]]["assistantId"], []).append(key)
+
+        self.phone_numbers = [
+            {"id": f"phone-{i:03d}", "number": f"+1555000{i:04d}", "provider": "vapi", "status": "active",
+             "assistantId": assistant_ids[i % len(assistant_ids)] if assistant_ids else None}
+            for i in range(phone_numbers)
+        ]
+        self.squads = [{"id": f"squad-{i:03d}", "name": f"Squad {i}",
+                        "members": [{"assistantId": assistant_id} for assistant_id in assistant_ids[i:i + 2]]}
+                       for i in range(squads)]
+        self.tools = [{"id": f"tool-{i:03d}", "type": "function", "function": {"name": f"tool_{i}"}}
+                      for i in range(tools)]
+        self.logs = [{"level": rng.choice(["INFO", "WARN", "ERROR"]), "message": f"Log message {i} " + "x" * 40,
+                      "timestamp": _iso(now - timedelta(minutes=i))} for i in range(logs)]
+
+    def list_calls(self, params):
+        keys = self._index.get(params.get("assistantId"), [])
+        low, high = 0, len(keys)
+        # "~" sorts after every call id, "" before, so bounds include or exclude the timestamp itself
+        if "createdAtGt" in params:
+            low = bisect.bisect_left(keys, (params["createdAtGt"], "~"))
+        if "createdAtGe" in params:
+            low = max(low, bisect.bisect_left(keys, (params["createdAtGe"], "")))
+        if "createdAtLt" in params:
+            high = bisect.bisect_left(keys, (params["createdAtLt"], ""), low)
+        if "createdAtLe" in params:
+            high = min(high, bisect.bisect_left(keys, (params["createdAtLe"], "~"), low))
+        limit = min(int(params.get("limit", 100)), MAX_PAGE_SIZE)
+        selected = keys[max(low, high - limit):high]
+        return [self.calls[call_id] for _, call_id in reversed(selected)]
+
+
+class MockVapiServer(ThreadingHTTPServer):
+    """HTTP server over a ``MockDataset``, with latency, rate limiting and error injection."""
+
+    daemon_threads = True
+
+    def __init__(self, address, dataset=None, latency=0.0, jitter=0.0, rate_limit=None, error_rate=0.0, seed=0):
+        super().__init__(address, MockVapiHandler)
+        self.dataset = dataset or MockDataset()
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.counts = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(rate_limit or 0)
+        self._updated = time.monotonic()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def admit(self):
+        """Returns ``(status, retry_after)`` for the next request: 0 to serve it, else the error to send."""
+        with self._lock:
+            if self.rate_limit:
+                now = time.monotonic()
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._updated) * self.rate_limit)
+                self._updated = now
+                if self._tokens < 1:
+                    return 429, (1 - self._tokens) / self.rate_limit
+                self._tokens -= 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                return 503, None
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        return 0, None
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+
+def _listing_route(name):
+    def route(handler, data, _, __, ___):
+        return handler._send(200, getattr(data, name))
+    return route
+
+
+def _create_route(name, prefix):
+    def route(handler, data, _, __, body):
+        items = getattr(data, name)
+        item = {**body, "id": f"{prefix}-new-{len(items):03d}"}
+        items.append(item)
+        return handler._send(201, item)
+    return route
+
+
+class MockVapiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _handle(self, method):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        segments = url.path.strip("/").split("/")
+        resource, item_id = segments[0], (segments[1] if len(segments) > 1 else None)
+        body = self._read_json() if method in ("POST", "PATCH") else None
+        self.server.count(f"{method} /{resource}" + ("/{id}" if item_id else ""))
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._send(401, {"message": "Missing Bearer token"})
+        status, retry_after = self.server.admit()
+        if status == 429:
+            return self._send(429, {"message": "Too Many Requests"}, {"Retry-After": f"{retry_after:.3f}"})
+        if status:
+            return self._send(status, {"message": "Service Unavailable"})
+
+        data = self.server.dataset
+        with data.lock:
+            route = self.ROUTES.get((method, resource, item_id is not None))
+            if route is None:
+                return self._send(404, {"message": f"Cannot {method} {url.path}"})
+            return route(self, data, item_id, params, body)
+
+    def _list_assistants(self, data, _, params, __):
+        return self._send(200, list(data.assistants.values())[:int(params.get("limit", 100))])
+
+    def _get_assistant(self, data, assistant_id, _, __):
+        if assistant_id not in data.assistants:
+            return self._send(404, {"message": "Assistant not found"})
+        return self._send(200, data.assistants[assistant_id])
+
+    def _create_assistant(self, data, _, __, body):
+        now = _iso(datetime.now(timezone.utc))
+        assistant = {**body, "id": f"asst-new-{len(data.assistants):04d}", "createdAt": now, "updatedAt": now}
+        data.assistants[assistant["id"]] = assistant
+        return self._send(201, assistant)
+
+    def _update_assistant(self, data, assistant_id, _, body):
+        if assistant_id not in data.assistants:
+            return self._send(404, {"message": "Assistant not found"})
+        data.assistants[assistant_id].update(body, updatedAt=_iso(datetime.now(timezone.utc)))
+        return self._send(200, data.assistants[assistant_id])
+
+    def _delete_assistant(self, data, assistant_id, _, __):
+        if assistant_id not in data.assistants:
+            return self._send(404, {"message": "Assistant not found"})
+        return self._send(200, data.assistants.pop(assistant_id))
+
+    def _list_calls(self, data, _, params, __):
+        return self._send(200, data.list_calls(params))
+
+    def _get_call(self, data, call_id, _, __):
+        if call_id not in data.calls:
+            return self._send(404, {"message": "Call not found"})
+        return self._send(200, data.calls[call_id])
+
+    def _list_phone_numbers(self, data, _, __, ___):
+        return self._send(200, data.phone_numbers)
+
+    def _update_phone_number(self, data, phone_id, _, body):
+        for phone in data.phone_numbers:
+            if phone["id"] == phone_id:
+                phone.update(body)
+                return self._send(200, phone)
+        return self._send(404, {"message": "Phone number not found"})
+
+    def _list_logs(self, data, _, params, __):
+        return self._send(200, data.logs[:int(params.get("limit", 100))])
+
+    ROUTES = {
+        ("GET", "assistant", False): _list_assistants,
+        ("GET", "assistant", True): _get_assistant,
+        ("POST", "assistant", False): _create_assistant,
+        ("PATCH", "assistant", True): _update_assistant,
+        ("DELETE", "assistant", True): _delete_assistant,
+        ("GET", "call", False): _list_calls,
+        ("GET", "call", True): _get_call,
+        ("GET", "phone-number", False): _list_phone_numbers,
+        ("PATCH", "phone-number", True): _update_phone_number,
+        ("GET", "squad", False): _listing_route("squads"),
+        ("POST", "squad", False): _create_route("squads", "squad"),
+        ("GET", "tool", False): _listing_route("tools"),
+        ("POST", "tool", False): _create_route("tools", "tool"),
+        ("GET", "log", False): _list_logs,
+    }
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+def start(host="127.0.0.1", port=0, **options):
+    """Starts a mock server on a daemon thread and returns it; ``port=0`` picks a free port.
+
+    ``options`` are ``MockVapiServer`` arguments; dataset sizes may be passed
+    as ``dataset=MockDataset(...)``.
+    """
+    server = MockVapiServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="mock-vapi", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Vapi API from a seeded in-memory dataset.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--assistants", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--days", type=float, default=30, help="spread calls over this many days")
+    parser.add_argument("--latency", type=float, default=0.05, help="base seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra random seconds, uniform")
+    parser.add_argument("--rate-limit", type=float, help="requests per second before answering 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    dataset = MockDataset(assistants=args.assistants, calls=args.calls, days=args.days)
+    server = MockVapiServer((args.host, args.port), dataset=dataset, latency=args.latency, jitter=args.jitter,
+                            rate_limit=args.rate_limit, error_rate=args.error_rate)
+    logger.info("Mock Vapi API with %d assistants and %d calls on %s", len(dataset.assistants), len(dataset.calls),
+                server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
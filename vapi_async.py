@@ -0,0 +1,155 @@
+"""Asyncio counterparts of the app.py API helpers, for headless batch jobs.
+
+``AsyncVapi`` exposes the same listing and detail helpers as the Streamlit app
+with the same return shapes (lists, or dicts/None), but as coroutines that can
+be gathered by the thousand. Requests go through one pooled ``VapiClient`` so
+they share its keep-alive connections, retry policy and rate limiter; a
+semaphore bounds how many are in flight.
+
+Run ``python vapi_async.py --days 1 --output snapshot.json`` for a nightly
+snapshot of every assistant, phone number, squad, tool and recent call with
+full call details. The API key is read from ``VAPI_API_KEY``.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+
+from app import (MAX_CALL_PAGE_SIZE, RATE_LIMIT_PER_SECOND, VAPI_BASE_URL, TokenBucket, VapiClient,
+                 _iter_call_pages, describe_api_error)
+
+DEFAULT_CONCURRENCY = 16
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncVapi:
+    """Concurrent, asyncio-facing wrapper around a shared ``VapiClient``."""
+
+    def __init__(self, api_key=None, concurrency=DEFAULT_CONCURRENCY, base_url=VAPI_BASE_URL,
+                 rate_limit=RATE_LIMIT_PER_SECOND, client=None):
+        self.client = client or VapiClient(
+            api_key or os.environ["VAPI_API_KEY"],
+            base_url=base_url,
+            rate_limiter=TokenBucket(rate_limit, burst=max(1, int(rate_limit * 2))),
+            pool_maxsize=concurrency
+        )
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="vapi-async")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.client.close()
+
+    async def _run(self, func, context, default):
+        """Runs a blocking call on the pool, logging failures and returning ``default`` like the app helpers."""
+        async with self._semaphore:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, func)
+            except requests.exceptions.RequestException as e:
+                logger.warning("%s failed: %s", context, describe_api_error(e))
+                return default
+
+    async def _get_json(self, path, context, default, params=None):
+        return await self._run(lambda: self.client.get(path, params=params).json(), context, default)
+
+    async def list_assistants(self, limit=100):
+        return await self._get_json("/assistant", "Listing Assistants", [], {"limit": limit})
+
+    async def get_assistant_config(self, assistant_id):
+        return await self._get_json(f"/assistant/{assistant_id}", "Fetching Assistant Config", None)
+
+    async def list_calls(self, assistant_id=None, limit=100, since=None, until=None):
+        def collect():
+            calls = []
+            pages = _iter_call_pages(self.client, assistant_id, since, until, page_size=min(limit, MAX_CALL_PAGE_SIZE))
+            for page in pages:
+                calls.extend(page)
+                if len(calls) >= limit:
+                    break
+            return calls[:limit]
+        return await self._run(collect, "Fetching Calls", [])
+
+    async def get_call_details(self, call_id):
+        return await self._get_json(f"/call/{call_id}", "Fetching Call Details", None)
+
+    async def list_phone_numbers(self):
+        return await self._get_json("/phone-number", "Fetching Phone Numbers", [])
+
+    async def list_squads(self):
+        return await self._get_json("/squad", "Fetching Squads", [])
+
+    async def list_tools(self):
+        return await self._get_json("/tool", "Fetching Tools", [])
+
+    async def get_assistant_configs(self, assistant_ids):
+        """Fetches many configs concurrently; returns ``{id: config}`` without failed ids."""
+        configs = await asyncio.gather(*(self.get_assistant_config(assistant_id) for assistant_id in assistant_ids))
+        return {assistant_id: config for assistant_id, config in zip(assistant_ids, configs) if config}
+
+    async def get_call_details_many(self, call_ids):
+        """Fetches many call details concurrently; returns ``{id: details}`` without failed ids."""
+        details = await asyncio.gather(*(self.get_call_details(call_id) for call_id in call_ids))
+        return {call_id: detail for call_id, detail in zip(call_ids, details) if detail}
+
+
+async def snapshot(api, since, call_limit):
+    """Pulls every listing plus full assistant configs and call details."""
+    assistants, phone_numbers, squads, tools, calls = await asyncio.gather(
+        api.list_assistants(limit=1000),
+        api.list_phone_numbers(),
+        api.list_squads(),
+        api.list_tools(),
+        api.list_calls(limit=call_limit, since=since),
+    )
+    configs, call_details = await asyncio.gather(
+        api.get_assistant_configs([assistant['id'] for assistant in assistants]),
+        api.get_call_details_many([call['id'] for call in calls]),
+    )
+    return {
+        "assistants": list(configs.values()),
+        "phoneNumbers": phone_numbers,
+        "squads": squads,
+        "tools": tools,
+        "calls": [call_details.get(call['id'], call) for call in calls],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot a Vapi org: assistants, numbers, squads, tools and recent calls.")
+    parser.add_argument("--days", type=float, default=1, help="how far back to pull calls")
+    parser.add_argument("--call-limit", type=int, default=100000)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT_PER_SECOND, help="max requests per second")
+    parser.add_argument("--base-url", default=VAPI_BASE_URL)
+    parser.add_argument("--output", default="-", help="JSON output path, or - for stdout")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def run():
+        async with AsyncVapi(concurrency=args.concurrency, base_url=args.base_url, rate_limit=args.rate) as api:
+            since = datetime.now().astimezone() - timedelta(days=args.days)
+            return await snapshot(api, since, args.call_limit)
+
+    result = asyncio.run(run())
+    if args.output == "-":
+        print(json.dumps(result, indent=2))
+    else:
+        with open(args.output, "w") as f:
+            json.dump(result, f)
+        logger.info("Wrote %s", ", ".join(f"{len(items)} {key}" for key, items in result.items()))
+
+
+if __name__ == "__main__":
+    main()